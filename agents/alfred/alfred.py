@@ -9,8 +9,8 @@ import asyncio
 from base_agent import BaseAgent, get_llm_instance, voices, RunContext_T
 from instructions import GREETER_INSTRUCTIONS
 from livekit.agents import Agent, function_tool
-from livekit.plugins import groq
-from status_queue import push_status
+from model_pool import acquire_tts
+from status_queue import push_event, SCREEN
 
 class AlfredA(BaseAgent):
     """Greeter agent that detects user intents and routes to appropriate agents"""
@@ -19,18 +19,18 @@ class AlfredA(BaseAgent):
         super().__init__(
             instructions=GREETER_INSTRUCTIONS,
             llm=get_llm_instance(parallel_tool_calls=False),
-            tts=groq.TTS(voice=voices["greeter"])
+            tts=acquire_tts(voices["greeter"])
         )
 
     async def on_enter(self) -> None:
         """Called when agent becomes active"""
-        push_status(f"screen: alfred")
+        push_event(SCREEN, screen="alfred")
         await super().on_enter()
 
     @function_tool()
     async def check_meetings(self, context: RunContext_T) -> tuple[Agent, str]:
         """This tool is used to check for meetings"""
-        push_status("screen: tool")
+        push_event(SCREEN, screen="tool")
         await asyncio.sleep(1)
         return await self._transfer_to_agent(
             "alfred",
@@ -42,7 +42,7 @@ class AlfredA(BaseAgent):
     async def work_with_email(self, context: RunContext_T) -> tuple[Agent, str]:
         """This tool is used to check for email, write a reply to the email,
           and send it, archive the promo email, and mark it as read."""
-        push_status("screen: tool")
+        push_event(SCREEN, screen="tool")
         await asyncio.sleep(1)
         return await self._transfer_to_agent(
             "alfred",
@@ -7,15 +7,16 @@ Following clean architecture patterns from EXAMPLE_PY.md
 from datetime import datetime
 import logging
 from dataclasses import dataclass, field
-from typing import Optional
-import os
+from typing import Callable, Iterable, Optional
 import yaml
 from dotenv import load_dotenv
 
 from livekit.agents import Agent
 from livekit.agents.voice import RunContext
-from livekit.plugins import groq
-from status_queue import push_status
+from model_pool import acquire_llm
+from context_budget import assemble_context
+from metrics import start_transfer, finish_transfer
+from status_queue import push_event, push_status, ON_ENTER, TRANSFER
 
 logger = logging.getLogger("alfred-agents")
 logger.setLevel(logging.INFO)
@@ -31,14 +32,8 @@ If you do not have appropriate tool or agent to handle the request, you should s
 """
 
 def get_llm_instance(parallel_tool_calls=None):
-    """Get LLM instance based on environment configuration"""
-    api_key = os.getenv("GROQ_API_KEY")
-
-    kwargs = {}
-    if parallel_tool_calls is not None:
-        kwargs["parallel_tool_calls"] = parallel_tool_calls
-
-    return groq.LLM(model=os.getenv("GROQ_LLM_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct"), api_key=api_key, **kwargs)
+    """Get the pooled LLM instance for this configuration (see model_pool)"""
+    return acquire_llm(parallel_tool_calls)
 
 # Voice configurations for different agents using Groq TTS
 voices = {
@@ -50,6 +45,69 @@ voices = {
     "gtasks": "Briggs-PlayAI",      # Task management - action-oriented
 }
 
+class AgentRegistry(dict[str, Agent]):
+    """
+    Agents of one session by name, built from their factory on first lookup.
+
+    Only agents that were actually reached live in the dict itself, so a call
+    that never gets past the guard never pays for the other agents' LLM/TTS
+    setup. `names()` lists everything that can be transferred to.
+    """
+
+    def __init__(self, factories: Optional[dict[str, Callable[[], Agent]]] = None) -> None:
+        super().__init__()
+        self.factories: dict[str, Callable[[], Agent]] = dict(factories or {})
+
+    def register(self, name: str, factory: Callable[[], Agent]) -> None:
+        self.factories[name] = factory
+
+    def names(self) -> list[str]:
+        return list(self.factories)
+
+    def __missing__(self, name: str) -> Agent:
+        factory = self.factories.get(name)
+        if factory is None:
+            raise KeyError(name)
+        agent = self[name] = factory()
+        logger.info(f"🎭 Agent built on first use: {name}")
+        push_status(f"Agent initialized: {name}")
+        return agent
+
+    def prebuild(self, names: Iterable[str]) -> None:
+        """Build the given agents ahead of their first transfer (e.g. after the session started)"""
+        for name in names:
+            if name in self.factories and not dict.__contains__(self, name):
+                self[name]  # built by __missing__
+
+
+# Summary sections: (summary key, UserData attribute, default when unset)
+SUMMARY_SECTIONS = {
+    "user_info": (
+        ("name", "user_name", "unknown"),
+        ("email", "user_email", "unknown"),
+    ),
+    "email_context": (
+        ("drafts", "email_drafts", []),
+        ("recipients", "email_recipients", []),
+        ("archived_count", "archived_count", 0),
+    ),
+    "calendar_context": (
+        ("scheduled_meetings", "scheduled_meetings", []),
+        ("calendar_events", "calendar_events", []),
+        ("meeting_times", "meeting_times", []),
+    ),
+    "task_context": (
+        ("created_tasks", "created_tasks", []),
+        ("task_descriptions", "task_descriptions", []),
+        ("task_deadlines", "task_deadlines", []),
+    ),
+}
+# Only the newest items of each context list go into the summary
+SUMMARY_LIST_WINDOW = 20
+# libyaml-backed dumper when PyYAML was built with it
+_YamlDumper = getattr(yaml, "CDumper", yaml.Dumper)
+
+
 @dataclass
 class UserData:
     """User data maintained across agent transfers"""
@@ -76,34 +134,57 @@ class UserData:
     task_deadlines: Optional[list[str]] = None
 
     # Agent management
-    agents: dict[str, Agent] = field(default_factory=dict)
+    agents: AgentRegistry = field(default_factory=AgentRegistry)
     prev_agent: Optional[Agent] = None
+    # (perf_counter, from agent) of the transfer in progress, for the transfer time metric
+    transfer_started: Optional[tuple[float, str]] = field(default=None, repr=False, compare=False)
+
+    # Serialized summary per section: {section: (fingerprint, yaml)}
+    _summary_cache: dict[str, tuple[tuple, str]] = field(default_factory=dict, repr=False, compare=False)
+
+    def _section_fingerprint(self, section: str) -> tuple:
+        """
+        Cheap change detector for one summary section. Context lists only ever
+        grow by append (or get replaced), so identity plus length is enough;
+        call mark_dirty() after editing a list item in place.
+        """
+        values = []
+        for _, attr, _ in SUMMARY_SECTIONS[section]:
+            value = getattr(self, attr)
+            values.append((id(value), len(value)) if isinstance(value, list) else value)
+        return tuple(values)
+
+    def mark_dirty(self, section: Optional[str] = None) -> None:
+        """Force re-serialization of one section (or all of them) on the next summarize()"""
+        if section is None:
+            self._summary_cache.clear()
+        else:
+            self._summary_cache.pop(section, None)
+
+    def _section_data(self, section: str) -> dict:
+        data = {}
+        for key, attr, default in SUMMARY_SECTIONS[section]:
+            value = getattr(self, attr) or default
+            if isinstance(value, list) and len(value) > SUMMARY_LIST_WINDOW:
+                # Keep the prompt flat as the session grows: newest items plus a count
+                data[f"{key}_omitted"] = len(value) - SUMMARY_LIST_WINDOW
+                value = value[-SUMMARY_LIST_WINDOW:]
+            data[key] = value
+        return data
 
     def summarize(self) -> str:
         """Summarize user data in YAML format for better LLM understanding"""
-        data = {
-            "user_info": {
-                "name": self.user_name or "unknown",
-                "email": self.user_email or "unknown"
-            },
-            "email_context": {
-                "drafts": self.email_drafts or [],
-                "recipients": self.email_recipients or [],
-                "archived_count": self.archived_count or 0
-            },
-            "calendar_context": {
-                "scheduled_meetings": self.scheduled_meetings or [],
-                "calendar_events": self.calendar_events or [],
-                "meeting_times": self.meeting_times or []
-            },
-            "task_context": {
-                "created_tasks": self.created_tasks or [],
-                "task_descriptions": self.task_descriptions or [],
-                "task_deadlines": self.task_deadlines or []
-            },
-        }
-        # AI-REQ: YAML format performs better than JSON for LLM context
-        return yaml.dump(data)
+        parts = []
+        # Sections in yaml.dump's sorted key order, so the output matches one dump of the whole dict
+        for section in sorted(SUMMARY_SECTIONS):
+            fingerprint = self._section_fingerprint(section)
+            cached = self._summary_cache.get(section)
+            if cached is None or cached[0] != fingerprint:
+                # AI-REQ: YAML format performs better than JSON for LLM context
+                cached = (fingerprint, yaml.dump({section: self._section_data(section)}, Dumper=_YamlDumper))
+                self._summary_cache[section] = cached
+            parts.append(cached[1])
+        return "".join(parts)
 
 # Type alias for RunContext with UserData
 RunContext_T = RunContext[UserData]
@@ -116,28 +197,23 @@ class BaseAgent(Agent):
         """Called when agent becomes active"""
         agent_name = self.__class__.__name__
         logger.info(f"🎭 Entering {agent_name}")
-        push_status(f"on_enter: {agent_name}")
+        push_event(ON_ENTER, agent=agent_name)
 
         userdata: UserData = self.session.userdata
-        chat_ctx = self.chat_ctx.copy()
-
-        # Add previous agent's chat history to current agent
-        if isinstance(userdata.prev_agent, Agent):
-            truncated_chat_ctx = userdata.prev_agent.chat_ctx.copy(
-                exclude_instructions=True, exclude_function_call=False
-            ).truncate(max_items=6)
-            existing_ids = {item.id for item in chat_ctx.items}
-            items_copy = [item for item in truncated_chat_ctx.items if item.id not in existing_ids]
-            chat_ctx.items.extend(items_copy)
-
-        # Add system instructions including user data context
-        chat_ctx.add_message(
-            role="system",
-            content=f"You are {agent_name} agent in Alfred voice assistant. Current user data: {userdata.summarize()}. "
-            f"Today is {datetime.now().strftime('%Y-%m-%d')}. Greet user and ask what user wants to do."
+        prev_agent = userdata.prev_agent
+
+        # Carry the previous agent's history over within the token budget and
+        # replace (not stack) this agent's system preamble with fresh user data
+        chat_ctx = assemble_context(
+            self.chat_ctx.copy(),
+            agent_name,
+            preamble=f"You are {agent_name} agent in Alfred voice assistant. Current user data: {userdata.summarize()}. "
+            f"Today is {datetime.now().strftime('%Y-%m-%d')}. Greet user and ask what user wants to do.",
+            prev_ctx=prev_agent.chat_ctx if isinstance(prev_agent, Agent) else None,
         )
 
         await self.update_chat_ctx(chat_ctx)
+        finish_transfer(userdata, agent_name)
         self.session.generate_reply(tool_choice="none")
 
     async def _transfer_to_agent(self, name: str, context: RunContext_T, message: Optional[str] = None) -> tuple[Agent, str]:
@@ -148,5 +224,6 @@ class BaseAgent(Agent):
         userdata.prev_agent = current_agent
 
         logger.info(f"🔄 Transferring from {current_agent.__class__.__name__} to {name}")
-        push_status(f"transfer_to_agent: {current_agent.__class__.__name__} to {name}")
+        push_event(TRANSFER, agent=current_agent.__class__.__name__, to=name)
+        start_transfer(userdata, current_agent.__class__.__name__)
         return next_agent, message or f"Transferring to {name} agent."
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for push_status per-call overhead on the caller's thread.
+
+Usage: STATUS_ECHO=false python bench_status.py [iterations]
+"""
+
+import logging
+import sys
+import time
+
+import status_queue
+from status_queue import (
+    push_status, push_event, get_status_hub, get_status_writer, set_status_level, StatusEvent, SCREEN,
+)
+
+
+def bench(label: str, fn, iterations: int) -> None:
+    start = time.perf_counter_ns()
+    for i in range(iterations):
+        fn()
+    elapsed = time.perf_counter_ns() - start
+    print(f"{label:<32} {elapsed / iterations:8.1f} ns/call")
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    writer = get_status_writer()
+    hub = get_status_hub()
+
+    bench("push_event (enqueue)", lambda: push_event(SCREEN, screen="alfred"), iterations)
+    bench("push_status (enqueue)", lambda: push_status("Alfred ready"), iterations)
+    writer.flush()
+    bench("hub.publish (encode + direct)", lambda: hub.publish(StatusEvent(SCREEN, payload={"screen": "alfred"})), iterations)
+
+    set_status_level(logging.WARNING)
+    bench("push_event (level disabled)", lambda: push_event(SCREEN, screen="alfred"), iterations)
+    set_status_level(logging.INFO)
+
+    print(f"published={hub.last_seq} subscribers={hub.subscribers} echo={status_queue.get_status_writer().stream is not None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Context budget - token-budgeted chat context assembly for agent transfers
+Carries the previous agent's history over within a token budget and keeps one system preamble per agent
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from livekit.agents import llm
+
+logger = logging.getLogger("alfred-context")
+
+# Token budget for carried-over history (system items are never counted or dropped)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("ALFRED_CONTEXT_TOKENS", "1500"))
+# Preamble messages get a stable id per agent so re-entering replaces instead of stacking them
+PREAMBLE_ID_PREFIX = "alfred-preamble-"
+# Per-item token estimates, keyed by chat item id (items are not edited after creation)
+TOKEN_CACHE_SIZE = 4096
+
+
+def _load_tokenizer() -> Callable[[str], int]:
+    """Count tokens with tiktoken when it is installed, otherwise estimate ~4 chars per token"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        return lambda text: len(text) // 4 + 1
+
+
+_count_tokens = _load_tokenizer()
+_token_cache: OrderedDict[str, int] = OrderedDict()
+
+
+def _item_text(item: llm.ChatItem) -> str:
+    if item.type == "message":
+        return item.text_content or ""
+    if item.type == "function_call":
+        return f"{item.name}({item.arguments})"
+    if item.type == "function_call_output":
+        return item.output or ""
+    return ""
+
+
+def estimate_tokens(item: llm.ChatItem) -> int:
+    tokens = _token_cache.get(item.id)
+    if tokens is None:
+        # A few tokens of per-message overhead (role, separators)
+        tokens = _count_tokens(_item_text(item)) + 4
+        _token_cache[item.id] = tokens
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    else:
+        _token_cache.move_to_end(item.id)
+    return tokens
+
+
+def _is_system(item: llm.ChatItem) -> bool:
+    return item.type == "message" and item.role in ("system", "developer")
+
+
+def _fit_budget(items: list[llm.ChatItem], budget: int) -> list[llm.ChatItem]:
+    """
+    Drop history until it fits `budget`: tool calls and their outputs go first
+    (oldest first, always as a pair), then the oldest conversation messages.
+    The newest message is always kept.
+    """
+    total = sum(estimate_tokens(item) for item in items if not _is_system(item))
+    if total <= budget:
+        return items
+
+    dropped: set[str] = set()
+    tool_items = [item for item in items if item.type in ("function_call", "function_call_output")]
+    for item in tool_items:
+        if total <= budget:
+            break
+        if item.id in dropped:
+            continue
+        # Drop the call together with its output (matched by call_id)
+        for pair in tool_items:
+            if pair.call_id == item.call_id and pair.id not in dropped:
+                dropped.add(pair.id)
+                total -= estimate_tokens(pair)
+
+    messages = [item for item in items if item.type == "message" and not _is_system(item)]
+    for item in messages[:-1]:
+        if total <= budget:
+            break
+        dropped.add(item.id)
+        total -= estimate_tokens(item)
+
+    logger.debug(f"Context trimmed: {len(dropped)} items dropped, ~{total} tokens kept")
+    return [item for item in items if item.id not in dropped]
+
+
+def assemble_context(
+    chat_ctx: llm.ChatContext,
+    agent_name: str,
+    preamble: str,
+    prev_ctx: Optional[llm.ChatContext] = None,
+    budget: int = CONTEXT_TOKEN_BUDGET,
+) -> llm.ChatContext:
+    """
+    Build the context for an agent that is (re-)entering: its own history plus
+    the previous agent's history (without instructions), trimmed to `budget`
+    tokens, followed by a single preamble system message for this agent.
+    `chat_ctx` must be a copy; it is modified and returned.
+    """
+    preamble_id = f"{PREAMBLE_ID_PREFIX}{agent_name}"
+    items = [item for item in chat_ctx.items if not item.id.startswith(PREAMBLE_ID_PREFIX)]
+
+    if prev_ctx is not None:
+        existing_ids = {item.id for item in items}
+        items.extend(
+            item for item in prev_ctx.copy(exclude_instructions=True, exclude_function_call=False).items
+            if item.id not in existing_ids and not item.id.startswith(PREAMBLE_ID_PREFIX)
+        )
+
+    chat_ctx.items[:] = _fit_budget(items, budget)
+    chat_ctx.add_message(role="system", content=preamble, id=preamble_id)
+    return chat_ctx
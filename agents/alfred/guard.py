@@ -7,10 +7,12 @@ import asyncio
 from typing import Annotated, Optional
 from base_agent import get_llm_instance, voices, RunContext_T, UserData
 from livekit.agents import Agent, function_tool
-from livekit.plugins import groq
+from model_pool import acquire_tts
 from instructions import GUARD_INSTRUCTIONS
+from context_budget import assemble_context
+from metrics import start_transfer, finish_transfer
 import logging
-from status_queue import push_status
+from status_queue import push_event, SCREEN, ON_ENTER, TRANSFER, PASSWORD
 
 count = 0
 
@@ -21,7 +23,7 @@ class GuardA(Agent):
         super().__init__(
             instructions=GUARD_INSTRUCTIONS,
             llm=get_llm_instance(parallel_tool_calls=False),
-            tts=groq.TTS(voice=voices["guard"]),
+            tts=acquire_tts(voices["guard"]),
             tools=[]
         )
 
@@ -31,19 +33,19 @@ class GuardA(Agent):
         count = userdata.login_attempts
         userdata.login_attempts += 1
 
-        push_status(f"screen: guard")
+        push_event(SCREEN, screen="guard")
 
         self.logger.info(f"🎭 Entering {self.__class__.__name__} [{count}]")
-        push_status(f"on_enter: {self.__class__.__name__} [{count}]")
-        chat_ctx = self.chat_ctx.copy()
-
-        # Add system instructions including user data context
-        chat_ctx.add_message(
-            role="system",
-            content=f"You are guard agent in Alfred voice assistant. "
+        push_event(ON_ENTER, agent=self.__class__.__name__, attempt=count)
+        # Add system instructions (replacing the one from a previous attempt)
+        chat_ctx = assemble_context(
+            self.chat_ctx.copy(),
+            self.__class__.__name__,
+            preamble="You are guard agent in Alfred voice assistant. ",
         )
 
         await self.update_chat_ctx(chat_ctx)
+        finish_transfer(userdata, self.__class__.__name__)
         self.session.generate_reply(tool_choice="none")
 
     async def _transfer_to_agent(self, name: str, context: RunContext_T, message: Optional[str] = None) -> tuple[Agent, str]:
@@ -54,7 +56,8 @@ class GuardA(Agent):
         userdata.prev_agent = current_agent
 
         self.logger.info(f"🔄 Transferring from {current_agent.__class__.__name__} to {name}")
-        push_status(f"transfer_to_agent: {current_agent.__class__.__name__} to {name}")
+        push_event(TRANSFER, agent=current_agent.__class__.__name__, to=name)
+        start_transfer(userdata, current_agent.__class__.__name__)
 
         return next_agent, message or f"Transferring to {name} agent."
 
@@ -71,10 +74,10 @@ class GuardA(Agent):
         user_password = userdata.user_password.lower() if userdata.user_password else None
 
         if password == user_password:
-            push_status(f"check_password -> correct")
+            push_event(PASSWORD, agent=self.__class__.__name__, correct=True)
             return await self._transfer_to_agent("alfred", context, "Correct password. Welcome home Bruce Wayne...")
         else:
-            push_status(f"check_password -> incorrect")
+            push_event(PASSWORD, agent=self.__class__.__name__, correct=False)
             return await self._transfer_to_agent("guard", context, "Incorrect password")
 
     async def close_session(self):
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Load test for multi-session status isolation.
+
+Simulates N concurrent calls the way the THREAD job executor runs them: every
+session gets its own thread and event loop, tags itself with
+set_status_session() and pushes a stream of typed events. One subscriber per
+session listens on that session's hub from the API loop. The run fails if any
+subscriber sees another session's event or misses one of its own, and prints
+the scaling curve (throughput and delivery latency per session count).
+
+Usage: STATUS_ECHO=false python loadtest_sessions.py [max_sessions] [events_per_session]
+"""
+
+import asyncio
+import statistics
+import sys
+import threading
+import time
+
+from status_queue import (
+    init as init_status_queue, get_status_hub, push_event, set_status_session, close_status_session,
+    Subscription, TOOL,
+)
+from sessions import register_session, unregister_session, session_snapshots
+
+
+def run_session(session_id: str, events: int, ready: threading.Barrier) -> None:
+    async def job():
+        set_status_session(session_id)
+        register_session(session_id)
+        ready.wait()
+        for i in range(events):
+            push_event(TOOL, agent="AlfredA", name="work_with_email", i=i, sent=time.perf_counter())
+            if i % 32 == 0:
+                await asyncio.sleep(0)
+        ready.wait()
+        unregister_session(session_id)
+
+    asyncio.run(job())
+
+
+async def collect(subscription: Subscription, events: int, latencies: list[float]) -> list[str]:
+    seen = []
+    try:
+        while len(seen) < events:
+            for _, event in await subscription.get():
+                seen.append(event.session)
+                latencies.append(time.perf_counter() - event.payload["sent"])
+    finally:
+        subscription.close()
+    return seen
+
+
+async def run_round(sessions: int, events: int) -> dict:
+    ids = [f"loadtest-room-{sessions}-{n}" for n in range(sessions)]
+    # Subscribe before any call starts so every subscriber's cursor begins at zero
+    subscriptions = [get_status_hub(session_id).subscribe(maxlen=events) for session_id in ids]
+    latencies: list[float] = []
+    collectors = [asyncio.create_task(collect(sub, events, latencies)) for sub in subscriptions]
+    ready = threading.Barrier(sessions + 1)
+    threads = [threading.Thread(target=run_session, args=(session_id, events, ready)) for session_id in ids]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    await asyncio.to_thread(ready.wait)
+    peak_tasks = sum(s["tasks"] for s in session_snapshots())
+    seen = await asyncio.wait_for(asyncio.gather(*collectors), timeout=120)
+    elapsed = time.perf_counter() - start
+    await asyncio.to_thread(ready.wait)
+    for thread in threads:
+        thread.join()
+
+    for session_id, received in zip(ids, seen):
+        foreign = [s for s in received if s != session_id]
+        if foreign or len(received) != events:
+            raise AssertionError(f"{session_id}: received {len(received)}/{events} events, {len(foreign)} foreign")
+        close_status_session(session_id)
+
+    return {
+        "sessions": sessions,
+        "events_per_s": sessions * events / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": statistics.quantiles(latencies, n=100)[98] * 1000,
+        "tasks": peak_tasks,
+    }
+
+
+async def main() -> None:
+    max_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    init_status_queue()
+
+    print(f"{'sessions':>8} {'events/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'tasks':>6}")
+    sessions = 1
+    while sessions <= max_sessions:
+        r = await run_round(sessions, events)
+        print(f"{r['sessions']:>8} {r['events_per_s']:>10.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['tasks']:>6}")
+        sessions *= 2
+    print("isolation: ok")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
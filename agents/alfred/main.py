@@ -6,17 +6,28 @@ Following clean architecture patterns from EXAMPLE_PY.md
 """
 
 import os
+import sys
+import time
 import asyncio
 import logging
 import urllib.parse
 from dotenv import load_dotenv
 import functools
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from typing import Optional
+from fastapi import FastAPI, Request, Form, HTTPException
+from fastapi.responses import HTMLResponse, Response
 from sse_starlette.sse import EventSourceResponse
 import uvicorn
 import threading
-from status_queue import push_status, init as init_status_queue, get_status_queue, push_status_async
+from status_queue import (
+    push_status, push_event, init as init_status_queue, find_status_hub, push_status_async,
+    set_status_session, close_status_session, DROP_OLDEST, DEFAULT_CAPACITY, SCREEN, AGENT_STATE, TOOL,
+)
+from sessions import (
+    register_session, unregister_session, session_snapshots, record_session_start, start_latency_snapshot,
+)
+from model_pool import get_model_pool, acquire_stt, acquire_tts, prewarm
+import metrics
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import queue
@@ -31,7 +42,6 @@ from guard import GuardA
 from livekit.agents import JobContext, WorkerOptions, cli, mcp, Worker, JobProcess
 from livekit.agents.voice import AgentSession
 from livekit.agents.voice.room_io import RoomInputOptions
-from livekit.plugins import silero, groq
 from livekit.agents.job import JobExecutorType
 
 # Configure logging
@@ -105,24 +115,57 @@ async def lifespan(app):
     yield
 
 app = FastAPI(lifespan=lifespan)
+# Upper bound for the ?batch_ms= flush interval of /status/stream
+MAX_BATCH_MS = 5000
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 os.makedirs(static_dir, exist_ok=True)
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
 
 @app.get("/status/stream")
-async def status_stream(request: Request):
+async def status_stream(request: Request, policy: str = DROP_OLDEST, maxlen: int = DEFAULT_CAPACITY,
+                        last_event_id: Optional[int] = None, kinds: Optional[str] = None, batch_ms: int = 0,
+                        session: Optional[str] = None):
+    # EventSource sends Last-Event-ID on reconnect; the query param allows manual resume
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+    # ?session= isolates one room; without it the stream carries every session
+    hub = find_status_hub(session)
+    if hub is None:
+        raise HTTPException(status_code=404, detail=f"Unknown status session: {session}")
+    try:
+        subscription = hub.subscribe(
+            maxlen=maxlen, policy=policy, last_event_id=last_event_id,
+            kinds=kinds.split(",") if kinds else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    batch_s = min(max(batch_ms, 0), MAX_BATCH_MS) / 1000
+
     async def event_generator():
-        while True:
-            if await request.is_disconnected():
-                break
-            try:
-                print(f"stream status_queue [{id(get_status_queue())}]", flush=True)
-                msg = await get_status_queue().async_q.get()
-                yield {"event": "status", "data": msg}
-            except Exception as e:
-                logger.error(f"Exception in status_stream event_generator: {e}")
-                break
+        try:
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    events = await subscription.get(batch_s)
+                    if batch_s and len(events) > 1:
+                        # One frame per window; events are already encoded, so just join them
+                        data = "[" + ",".join(event.data for _, event in events) + "]"
+                        yield {"id": str(events[-1][0]), "event": "batch", "data": data}
+                    else:
+                        for seq, event in events:
+                            yield {"id": str(seq), "event": "status", "data": event.data}
+                except Exception as e:
+                    logger.error(f"Exception in status_stream event_generator: {e}")
+                    break
+                if subscription.closed:
+                    # The session ended
+                    break
+        finally:
+            subscription.close()
     return EventSourceResponse(event_generator())
 
 @app.post("/status/push")
@@ -130,16 +173,58 @@ async def push_test_status(msg: str = Form(...)):
     await push_status_async(msg)
     return {"status": "ok"}
 
+@app.get("/sessions")
+async def sessions():
+    """Per-session resource accounting for every call this worker hosts"""
+    snapshots = session_snapshots()
+    return {
+        "sessions": snapshots,
+        "total": len(snapshots),
+        "start_latency": start_latency_snapshot(),
+        "model_pool": get_model_pool().stats(),
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for this worker"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/")
 async def root():
     with open(os.path.join(static_dir, "index.html"), "r") as f:
         return HTMLResponse(f.read())
 
 
+def _current_agent_name(session: AgentSession) -> Optional[str]:
+    """Class name of the session's active agent, if it has one yet"""
+    try:
+        return session.current_agent.__class__.__name__
+    except RuntimeError:
+        return None
+
+
+def _session_memory(userdata: UserData) -> int:
+    """Rough bytes held by one session: its agents' chat contexts and user data lists"""
+    total = 0
+    for agent in list(userdata.agents.values()):
+        for item in agent.chat_ctx.items:
+            total += sys.getsizeof(item) + len(getattr(item, "text_content", None) or "")
+    for value in vars(userdata).values():
+        if isinstance(value, list):
+            total += sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    return total
+
+
 async def entrypoint(ctx: JobContext):
     """Main entrypoint for Alfred voice assistant"""
+    started = time.perf_counter()
     await ctx.connect()
 
+    # Every status event pushed from this job (and the tasks it spawns) is tagged with the room
+    session_id = ctx.room.name
+    set_status_session(session_id)
+
     logger.info("🦇 Alfred Voice Assistant starting...")
     push_status("Alfred Voice Assistant starting...")
 
@@ -157,25 +242,36 @@ async def entrypoint(ctx: JobContext):
 
     # Initialize user data
     userdata = UserData()
+    register_session(session_id, memory_probe=functools.partial(_session_memory, userdata))
+
+    async def _release_session():
+        unregister_session(session_id)
+        close_status_session(session_id)
+        await get_model_pool().release_loop()
+
+    ctx.add_shutdown_callback(_release_session)
 
-    # Create all Alfred agents
-    userdata.agents.update({
-        "guard": GuardA(),
-        "alfred": AlfredA()
-    })
+    # Register all Alfred agents; each one is built on its first transfer
+    userdata.agents.register("guard", GuardA)
+    userdata.agents.register("alfred", AlfredA)
 
-    logger.info("🎭 All Alfred agents initialized:")
-    for agent_name in userdata.agents.keys():
+    logger.info("🎭 All Alfred agents registered:")
+    for agent_name in userdata.agents.names():
         logger.info(f"  - {agent_name}")
-        push_status(f"Agent initialized: {agent_name}")
+
+    # Shared VAD: loaded once per process (prewarm), only the first session pays for it.
+    # Popped, so later sessions of this process are not charged for the prewarm too
+    vad, cold_start = get_model_pool().vad()
+    cold_start = ctx.proc.userdata.pop("vad_cold", False) or cold_start
+    prewarm_s = ctx.proc.userdata.pop("prewarm_s", 0.0)
 
     # Create agent session
     session = AgentSession[UserData](
         userdata=userdata,
-        stt=groq.STT(model=os.getenv("GROQ_STT_MODEL", "whisper-large-v3-turbo")),
+        stt=acquire_stt(os.getenv("GROQ_STT_MODEL", "whisper-large-v3-turbo")),
         llm=get_llm_instance(),
-        tts=groq.TTS(voice=os.getenv("GROQ_TTS_VOICE", "Arista-PlayAI"), model=os.getenv("GROQ_TTS_MODEL", "playai-tts")),  # Each agent will use its own Groq TTS
-        vad=silero.VAD.load(),
+        tts=acquire_tts(os.getenv("GROQ_TTS_VOICE", "Arista-PlayAI"), os.getenv("GROQ_TTS_MODEL", "playai-tts")),  # Each agent will use its own Groq TTS
+        vad=vad,
         max_tool_steps=5,
         mcp_servers=[
             mcp.MCPServerHTTP(
@@ -186,7 +282,9 @@ async def entrypoint(ctx: JobContext):
         ]
     )
 
-    from livekit.agents.voice.events import UserInputTranscribedEvent, AgentStateChangedEvent, FunctionToolsExecutedEvent
+    from livekit.agents.voice.events import (
+        UserInputTranscribedEvent, AgentStateChangedEvent, FunctionToolsExecutedEvent, MetricsCollectedEvent,
+    )
 
     @session.on("user_input_transcribed")
     def on_user_input_transcribed(event: UserInputTranscribedEvent):
@@ -195,17 +293,22 @@ async def entrypoint(ctx: JobContext):
     @session.on("agent_state_changed")
     def agent_state_changed(event: AgentStateChangedEvent):
         logger.info(f"Agent state changed: {event.old_state}, new state: {event.new_state}")
-        push_status(f"Agent state changed: {event.old_state}, new state: {event.new_state}")
+        push_event(AGENT_STATE, agent=_current_agent_name(session), old=event.old_state, new=event.new_state)
 
     @session.on("close")
     def on_close():
         logger.info("Session closed")
-        push_status("screen: intro")
+        push_event(SCREEN, screen="intro")
 
     @session.on("function_tools_executed")
     def on_function_tools_executed(event: FunctionToolsExecutedEvent):
         logger.info(f"Function tools executed: {event.function_calls[0].name}")
-        push_status(f"tool: {event.function_calls[0].name}")
+        push_event(TOOL, agent=_current_agent_name(session), name=event.function_calls[0].name)
+        metrics.observe_tools(event)
+
+    @session.on("metrics_collected")
+    def on_metrics_collected(event: MetricsCollectedEvent):
+        metrics.observe_pipeline_metrics(event.metrics)
 
     logger.info("🎤 Starting voice session with Alfred (Guard agent)")
     push_status("Starting voice session with Alfred (Guard agent)")
@@ -216,6 +319,15 @@ async def entrypoint(ctx: JobContext):
         room_input_options=RoomInputOptions(),
     )
 
+    # Optionally warm agents users usually reach, once the call is already live
+    prebuild = [name for name in os.getenv("ALFRED_PREBUILD_AGENTS", "").split(",") if name]
+    if prebuild:
+        asyncio.get_running_loop().call_soon(userdata.agents.prebuild, prebuild)
+
+    start_s = time.perf_counter() - started + prewarm_s
+    record_session_start(session_id, start_s, cold_start)
+    logger.info(f"⏱  Session {session_id} started in {start_s * 1000:.0f} ms ({'cold' if cold_start else 'warm'})")
+
     logger.info("✅ Alfred Voice Assistant ready for Master Bruce")
     push_status("Alfred Voice Assistant ready for Master Bruce")
 
@@ -234,6 +346,7 @@ async def run_worker():
     # build the worker with *thread* executor (same PID, same queue)
     opts = WorkerOptions(
         entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
         job_executor_type=JobExecutorType.THREAD,
         num_idle_processes=0,
         ws_url           = os.environ["LIVEKIT_URL"],
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Worker metrics - Prometheus instruments for the Alfred voice worker
+Agent transfers, tool calls, STT/LLM/TTS stage timings and SSE fan-out, exposed on GET /metrics
+"""
+
+import time
+from typing import Any, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from sessions import session_count
+from status_queue import status_stats
+
+# Voice pipeline stages run from tens of milliseconds to several seconds
+STAGE_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+TRANSFER_SECONDS = Histogram(
+    "alfred_agent_transfer_seconds",
+    "Time from a transfer tool handing off until the next agent has entered",
+    ["from_agent", "to_agent"],
+    buckets=STAGE_BUCKETS,
+)
+TOOL_SECONDS = Histogram(
+    "alfred_tool_seconds",
+    "Function tool execution time",
+    ["tool"],
+    buckets=STAGE_BUCKETS,
+)
+TOOL_CALLS = Counter(
+    "alfred_tool_calls_total",
+    "Function tool calls by outcome",
+    ["tool", "status"],
+)
+STAGE_SECONDS = Histogram(
+    "alfred_pipeline_stage_seconds",
+    "STT/LLM/TTS stage timings reported by the LiveKit metrics_collected event",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+ACTIVE_SESSIONS = Gauge("alfred_active_sessions", "Voice sessions hosted by this worker")
+SSE_SUBSCRIBERS = Gauge("alfred_sse_subscribers", "Connected /status/stream subscribers")
+SSE_QUEUE_DEPTH = Gauge("alfred_sse_queue_depth", "Status events not yet read by the slowest SSE subscriber")
+SSE_DROPPED = Gauge("alfred_sse_dropped_events", "Status events skipped by lagging SSE subscribers")
+STATUS_WRITER_QUEUE = Gauge("alfred_status_writer_queue_depth", "Status events waiting for the background writer")
+
+ACTIVE_SESSIONS.set_function(session_count)
+SSE_SUBSCRIBERS.set_function(lambda: status_stats()["subscribers"])
+SSE_QUEUE_DEPTH.set_function(lambda: status_stats()["backlog"])
+SSE_DROPPED.set_function(lambda: status_stats()["dropped"])
+STATUS_WRITER_QUEUE.set_function(lambda: status_stats()["writer_queue"])
+
+# metrics_collected payload type -> (stage label, attribute) pairs worth recording
+_STAGE_FIELDS = {
+    "stt_metrics": (("stt", "duration"),),
+    "llm_metrics": (("llm", "duration"), ("llm_ttft", "ttft")),
+    "tts_metrics": (("tts", "duration"), ("tts_ttfb", "ttfb")),
+    "eou_metrics": (("end_of_utterance", "end_of_utterance_delay"), ("transcription", "transcription_delay")),
+}
+
+
+def observe_pipeline_metrics(metrics: Any) -> None:
+    """Record one LiveKit metrics payload (STTMetrics, LLMMetrics, TTSMetrics, EOUMetrics)"""
+    for stage, attribute in _STAGE_FIELDS.get(getattr(metrics, "type", None), ()):
+        value = getattr(metrics, attribute, None)
+        # Streamed STT reports 0 and unknown first-token times are negative
+        if value is not None and value > 0:
+            STAGE_SECONDS.labels(stage).observe(value)
+
+
+def observe_tools(event: Any) -> None:
+    """Record a function_tools_executed event: per-tool duration from call to output creation"""
+    outputs = {output.call_id: output for output in event.function_call_outputs if output is not None}
+    for call in event.function_calls:
+        output = outputs.get(call.call_id)
+        if output is None:
+            TOOL_CALLS.labels(call.name, "no_output").inc()
+            continue
+        TOOL_CALLS.labels(call.name, "error" if output.is_error else "ok").inc()
+        TOOL_SECONDS.labels(call.name).observe(max(0.0, output.created_at - call.created_at))
+
+
+def start_transfer(userdata: Any, from_agent: str) -> None:
+    """Mark the start of an agent transfer; finished by `finish_transfer` in the next agent's on_enter"""
+    userdata.transfer_started = (time.perf_counter(), from_agent)
+
+
+def finish_transfer(userdata: Any, to_agent: str) -> Optional[float]:
+    started = getattr(userdata, "transfer_started", None)
+    if started is None:
+        return None
+    userdata.transfer_started = None
+    elapsed = time.perf_counter() - started[0]
+    TRANSFER_SECONDS.labels(started[1], to_agent).observe(elapsed)
+    return elapsed
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
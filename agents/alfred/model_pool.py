@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Model pool - shared VAD model and reference-counted Groq plugin clients
+Loads the Silero VAD once per process and hands out LLM/STT/TTS clients by configuration
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from livekit.agents import JobProcess
+from livekit.plugins import groq, silero
+
+logger = logging.getLogger("alfred-model-pool")
+
+
+@dataclass
+class PoolEntry:
+    """One pooled client and the number of agents/sessions currently holding it"""
+    value: Any
+    refs: int = 0
+
+
+class ModelPool:
+    """
+    Reference-counted registry of plugin clients keyed by their configuration.
+
+    Groq clients wrap an httpx.AsyncClient whose keep-alive pool is bound to the
+    event loop that first uses it, and the THREAD executor runs every job on its
+    own loop, so HTTP clients are pooled per loop: all agents of a session share
+    one keep-alive pool per configuration instead of building their own. The
+    VAD model is loop-independent and shared by the whole process.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Hashable, PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._vad: Optional[silero.VAD] = None
+        self._vad_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _loop_key() -> Optional[int]:
+        try:
+            return id(asyncio.get_running_loop())
+        except RuntimeError:
+            return None
+
+    def acquire(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the pooled client for `key` on the current loop, building it on first use"""
+        full_key = (self._loop_key(), key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self.misses += 1
+                entry = self._entries[full_key] = PoolEntry(factory())
+            else:
+                self.hits += 1
+            entry.refs += 1
+            return entry.value
+
+    async def release(self, key: Hashable) -> None:
+        """Drop one reference; the client is closed when nobody holds it any more"""
+        full_key = (self._loop_key(), key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[full_key]
+        await _aclose(entry.value)
+
+    async def release_loop(self) -> None:
+        """Close every client pooled on the current loop (job shutdown)"""
+        loop_key = self._loop_key()
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == loop_key]
+            entries = [self._entries.pop(k) for k in keys]
+        for entry in entries:
+            await _aclose(entry.value)
+
+    def vad(self) -> tuple[silero.VAD, bool]:
+        """Process-wide VAD model; the flag is True when this call had to load it"""
+        if self._vad is not None:
+            return self._vad, False
+        with self._vad_lock:
+            if self._vad is not None:
+                return self._vad, False
+            self._vad = silero.VAD.load()
+            logger.info("🔊 Silero VAD loaded")
+            return self._vad, True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "clients": len(self._entries),
+                "refs": sum(e.refs for e in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "vad_loaded": self._vad is not None,
+            }
+
+
+async def _aclose(value: Any) -> None:
+    aclose = getattr(value, "aclose", None)
+    if aclose is None:
+        return
+    try:
+        await aclose()
+    except Exception as e:
+        logger.warning(f"Failed to close pooled client {value.__class__.__name__}: {e}")
+
+
+_pool = ModelPool()
+
+
+def get_model_pool() -> ModelPool:
+    return _pool
+
+
+def acquire_llm(parallel_tool_calls: Optional[bool] = None) -> groq.LLM:
+    model = os.getenv("GROQ_LLM_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
+    kwargs = {}
+    if parallel_tool_calls is not None:
+        kwargs["parallel_tool_calls"] = parallel_tool_calls
+    return _pool.acquire(
+        ("llm", model, parallel_tool_calls),
+        lambda: groq.LLM(model=model, api_key=os.getenv("GROQ_API_KEY"), **kwargs),
+    )
+
+
+def acquire_tts(voice: str, model: Optional[str] = None) -> groq.TTS:
+    kwargs = {"model": model} if model else {}
+    return _pool.acquire(("tts", voice, model), lambda: groq.TTS(voice=voice, **kwargs))
+
+
+def acquire_stt(model: str) -> groq.STT:
+    return _pool.acquire(("stt", model), lambda: groq.STT(model=model))
+
+
+def prewarm(proc: JobProcess) -> None:
+    """LiveKit prewarm hook: make sure the VAD model is resident before the job starts"""
+    started = time.perf_counter()
+    proc.userdata["vad"], proc.userdata["vad_cold"] = _pool.vad()
+    proc.userdata["prewarm_s"] = time.perf_counter() - started
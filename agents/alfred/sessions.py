@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Session registry - per-room resource accounting for the multi-session worker
+Every LiveKit job registers its room here so /sessions can report what each call costs
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from status_queue import find_status_hub
+
+
+@dataclass
+class SessionStats:
+    """Resource accounting for one voice session (LiveKit room)"""
+    session_id: str
+    loop: asyncio.AbstractEventLoop
+    started_at: float = field(default_factory=time.time)
+    # Returns an estimate of the bytes held by the session (chat contexts, user data)
+    memory_probe: Optional[Callable[[], int]] = None
+    # Time from job entry to a started voice session; cold when it had to load shared models
+    start_s: Optional[float] = None
+    cold_start: Optional[bool] = None
+
+    def snapshot(self) -> dict:
+        # THREAD executor: each job runs its own event loop, so its tasks are the session's tasks
+        try:
+            tasks = len(asyncio.all_tasks(self.loop)) if not self.loop.is_closed() else 0
+        except RuntimeError:
+            # The job loop mutated its task set while we were counting; report unknown
+            tasks = -1
+        try:
+            memory = self.memory_probe() if self.memory_probe else 0
+        except Exception:
+            memory = -1
+        hub = find_status_hub(self.session_id)
+        return {
+            "session": self.session_id,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "tasks": tasks,
+            "memory_bytes": memory,
+            "status_events": hub.last_seq if hub is not None else 0,
+            "start_ms": round(self.start_s * 1000, 1) if self.start_s is not None else None,
+            "cold_start": self.cold_start,
+        }
+
+
+@dataclass
+class StartLatency:
+    """Aggregated session start latency, split by cold and warm starts"""
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_s / self.count * 1000, 1) if self.count else None,
+            "max_ms": round(self.max_s * 1000, 1),
+        }
+
+
+_sessions: dict[str, SessionStats] = {}
+_start_latency = {"cold": StartLatency(), "warm": StartLatency()}
+
+
+def register_session(session_id: str, loop: Optional[asyncio.AbstractEventLoop] = None,
+                     memory_probe: Optional[Callable[[], int]] = None) -> SessionStats:
+    """Register the calling job's session; call from the job's event loop."""
+    stats = SessionStats(session_id, loop or asyncio.get_running_loop(), memory_probe=memory_probe)
+    _sessions[session_id] = stats
+    return stats
+
+
+def unregister_session(session_id: str) -> None:
+    _sessions.pop(session_id, None)
+
+
+def record_session_start(session_id: str, seconds: float, cold: bool) -> None:
+    """Record how long the session took to start and whether it paid for model loading"""
+    stats = _sessions.get(session_id)
+    if stats is not None:
+        stats.start_s = seconds
+        stats.cold_start = cold
+    _start_latency["cold" if cold else "warm"].add(seconds)
+
+
+def start_latency_snapshot() -> dict:
+    return {kind: latency.snapshot() for kind, latency in _start_latency.items()}
+
+
+def session_count() -> int:
+    return len(_sessions)
+
+
+def session_snapshots() -> list[dict]:
+    return [stats.snapshot() for stats in list(_sessions.values())]
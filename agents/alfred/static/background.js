@@ -11,13 +11,19 @@ const onMessageCb = (data) => {
   console.log("background status event:", data);
   msgBus.post({ type: "status", payload: data });
 
-  if (data.includes("screen:")) {
-    const screen = data.split(":")[1];
-    const trimmedScreen = screen.trim();
-    if (stateScreen[trimmedScreen]) {
-      console.log("change screen:", trimmedScreen);
-      iframe.src = stateScreen[trimmedScreen];
-      msgBus.post({ type: "screen:changed", payload: trimmedScreen });
+  let event;
+  try {
+    event = JSON.parse(data);
+  } catch {
+    return;
+  }
+
+  if (event.kind === "screen") {
+    const screen = event.payload && event.payload.screen;
+    if (stateScreen[screen]) {
+      console.log("change screen:", screen);
+      iframe.src = stateScreen[screen];
+      msgBus.post({ type: "screen:changed", payload: screen });
     }
   }
 };
@@ -1,10 +1,21 @@
-const _evtSource = new EventSource("/status/stream");
+// ?session=<room> on the page URL narrows the stream to a single call
+const _session = new URLSearchParams(window.location.search).get("session");
+const _evtSource = new EventSource(
+  "/status/stream" + (_session ? `?session=${encodeURIComponent(_session)}` : "")
+);
 
 export const listenSSE = (onMessageCb, onErrorCb = () => {}) => {
   _evtSource.addEventListener("status", function (event) {
     onMessageCb(event.data);
   });
 
+  // Sent instead of "status" frames when the stream is opened with ?batch_ms=
+  _evtSource.addEventListener("batch", function (event) {
+    for (const item of JSON.parse(event.data)) {
+      onMessageCb(JSON.stringify(item));
+    }
+  });
+
   _evtSource.onerror = function (error) {
     console.error("Event source error", error);
     onErrorCb(error);
@@ -1,34 +1,474 @@
-import janus
 import asyncio
+import atexit
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, TextIO
 
-_status_queue = None
+# Size of the shared status ring (and the largest backlog any subscriber can hold)
+DEFAULT_CAPACITY = 256
+
+# Optional on-disk spill of older messages for Last-Event-ID replay
+SPILL_PATH_ENV = "STATUS_SPILL_PATH"
+SPILL_SLOTS_ENV = "STATUS_SPILL_SLOTS"
+DEFAULT_SPILL_SLOTS = 4096
+SPILL_SLOT_SIZE = 512
+
+# Minimum level for push_status (messages below it are dropped before any work)
+STATUS_LEVEL_ENV = "STATUS_LEVEL"
+# Echo published status lines to stdout from the background writer
+STATUS_ECHO_ENV = "STATUS_ECHO"
+
+# Slow consumer policies
+DROP_OLDEST = "drop_oldest"   # lagging subscriber skips to the oldest retained message
+COALESCE = "coalesce"         # backlog is collapsed to the latest event per kind and agent
+
+# Status event kinds
+STATUS = "status"             # free-form text, payload {"text": ...}
+SCREEN = "screen"             # UI screen switch, payload {"screen": ...}
+ON_ENTER = "on_enter"         # agent became active
+TRANSFER = "transfer"         # payload {"from": ..., "to": ...}
+AGENT_STATE = "agent_state"   # payload {"old": ..., "new": ...}
+TOOL = "tool"                 # payload {"name": ...}
+PASSWORD = "password"         # payload {"correct": bool}
+
+# Kinds where a newer event for the same agent supersedes older ones in a batch
+SUPERSEDED_KINDS = frozenset({AGENT_STATE, SCREEN})
+
+_json_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+@dataclass(slots=True)
+class StatusEvent:
+    """
+    One typed status event. `data` is its compact JSON encoding, produced once
+    by the status writer and then shared by every subscriber and the spill log.
+    """
+    kind: str
+    agent: Optional[str] = None
+    payload: Optional[dict[str, Any]] = None
+    session: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+    data: str = ""
+
+    def encode(self) -> str:
+        if not self.data:
+            obj: dict[str, Any] = {"kind": self.kind, "ts": int(self.ts * 1000)}
+            if self.agent is not None:
+                obj["agent"] = self.agent
+            if self.session is not None:
+                obj["session"] = self.session
+            if self.payload:
+                obj["payload"] = self.payload
+            self.data = _json_encode(obj)
+        return self.data
+
+    @classmethod
+    def decode(cls, data: str) -> "StatusEvent":
+        obj = json.loads(data)
+        return cls(kind=obj["kind"], agent=obj.get("agent"), payload=obj.get("payload"),
+                   session=obj.get("session"), ts=obj.get("ts", 0) / 1000, data=data)
+
+
+class SpillLog:
+    """
+    Fixed-size, mmap'd ring of status messages that outlives the in-memory ring.
+
+    Every slot is `seq (u64) | length (u32) | utf-8 JSON event`; a slot is only
+    returned when its stored sequence matches the requested one, so stale slots
+    from a previous lap (or a previous process) are never replayed.
+    """
+
+    _HEADER = struct.Struct("<QI")
+
+    def __init__(self, path: str, slots: int = DEFAULT_SPILL_SLOTS, slot_size: int = SPILL_SLOT_SIZE) -> None:
+        self.slots = slots
+        self.slot_size = slot_size
+        self._payload_size = slot_size - self._HEADER.size
+        with open(path, "a+b") as f:
+            f.truncate(slots * slot_size)
+            self._mm = mmap.mmap(f.fileno(), slots * slot_size)
+
+    def write(self, seq: int, event_data: str) -> None:
+        data = event_data.encode("utf-8")
+        if len(data) > self._payload_size:
+            # A truncated event would not decode; keep it replayable as plain status text
+            data = StatusEvent(STATUS, payload={"text": "(event too large to replay)"}).encode().encode("utf-8")
+        offset = (seq % self.slots) * self.slot_size
+        self._HEADER.pack_into(self._mm, offset, seq, len(data))
+        self._mm[offset + self._HEADER.size:offset + self._HEADER.size + len(data)] = data
+
+    def read(self, seq: int) -> Optional[str]:
+        offset = (seq % self.slots) * self.slot_size
+        stored_seq, length = self._HEADER.unpack_from(self._mm, offset)
+        if stored_seq != seq:
+            return None
+        start = offset + self._HEADER.size
+        return self._mm[start:start + length].decode("utf-8", errors="ignore")
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class StatusHub:
+    """
+    Fan-out broadcast of status events to every /status/stream subscriber.
+
+    Events are written once into a fixed-size ring indexed by a monotonically
+    increasing sequence number. Each subscriber only keeps a cursor into that
+    ring, so publishing costs the same no matter how many dashboards are
+    connected, and a subscriber that stops reading can never grow memory.
+    The sequence number doubles as the SSE event id: a reconnecting client is
+    replayed the gap after its Last-Event-ID from the ring (or the spill log).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill: Optional[SpillLog] = None) -> None:
+        self.capacity = capacity
+        self.spill = spill
+        self._ring: list[Optional[StatusEvent]] = [None] * capacity
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event = asyncio.Event()
+        self._notify_pending = False
+        self._subscriptions: set["Subscription"] = set()
+        self.dropped = 0
+        self.closed = False
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Bind the event loop that runs the SSE subscribers."""
+        self._loop = loop
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def backlog(self) -> int:
+        """Events published but not yet read by the furthest-behind subscriber."""
+        return max((self._seq - sub.cursor for sub in list(self._subscriptions)), default=0)
+
+    def publish(self, event: StatusEvent) -> int:
+        """Thread-safe, non-blocking publish. Returns the event sequence number."""
+        data = event.encode()
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._ring[seq % self.capacity] = event
+            if self.spill is not None:
+                self.spill.write(seq, data)
+            schedule = self._loop is not None and not self._notify_pending
+            if schedule:
+                self._notify_pending = True
+        if schedule:
+            # One wakeup per burst, not per message or per subscriber
+            self._loop.call_soon_threadsafe(self._notify)
+        return seq
+
+    def _notify(self) -> None:
+        """Runs on the bound loop: wake every waiting subscriber at once."""
+        with self._lock:
+            self._notify_pending = False
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    @property
+    def retained(self) -> int:
+        """How many of the newest messages can still be replayed."""
+        return max(self.capacity, self.spill.slots if self.spill is not None else 0)
+
+    def read_after(self, after: int, limit: int) -> tuple[int, list[tuple[int, StatusEvent]]]:
+        """
+        Return (last_seq, [(seq, event)]) published after sequence `after`,
+        keeping at most `limit` of the newest ones. Skipped messages are counted
+        as dropped.
+        """
+        with self._lock:
+            last = self._seq
+            first = max(after + 1, last - min(limit, self.retained) + 1)
+            ring_first = max(first, last - self.capacity + 1)
+            msgs = []
+            if first < ring_first:
+                # Older than the in-memory ring: replay from the spill log
+                for seq in range(first, ring_first):
+                    data = self.spill.read(seq)
+                    if data is not None:
+                        msgs.append((seq, StatusEvent.decode(data)))
+            msgs.extend((seq, self._ring[seq % self.capacity]) for seq in range(ring_first, last + 1))
+        skipped = (last - after) - len(msgs)
+        if skipped > 0:
+            self.dropped += skipped
+        return last, msgs
+
+    async def wait_after(self, after: int) -> None:
+        """Wait until something newer than `after` has been published, or the hub is closed."""
+        while self._seq <= after and not self.closed:
+            await self._event.wait()
+
+    def close(self) -> None:
+        """Thread-safe. Close every subscription and wake them so their streams can end."""
+        self.closed = True
+        for subscription in list(self._subscriptions):
+            subscription.close()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._notify)
+
+    def subscribe(self, maxlen: int = DEFAULT_CAPACITY, policy: str = DROP_OLDEST,
+                  last_event_id: Optional[int] = None, kinds: Optional[Iterable[str]] = None) -> "Subscription":
+        return Subscription(self, maxlen=maxlen, policy=policy, last_event_id=last_event_id, kinds=kinds)
+
+
+class Subscription:
+    """
+    A subscriber's bounded window over the hub ring.
+
+    `maxlen` bounds how far behind the subscriber may fall before the oldest
+    pending events are dropped; with the COALESCE policy the pending backlog
+    is additionally collapsed to the newest event per (kind, agent). `kinds`
+    restricts the subscription to a subset of event kinds.
+    When resuming from `last_event_id` the first read replays the whole gap
+    the hub still retains, regardless of `maxlen`.
+    Once the hub is closed `closed` is set; `get` then returns what is still
+    pending without waiting.
+    """
+
+    def __init__(self, hub: StatusHub, maxlen: int, policy: str, last_event_id: Optional[int] = None,
+                 kinds: Optional[Iterable[str]] = None) -> None:
+        if policy not in (DROP_OLDEST, COALESCE):
+            raise ValueError(f"Unknown status subscription policy: {policy}")
+        self.hub = hub
+        self.maxlen = max(1, min(maxlen, hub.capacity))
+        self.policy = policy
+        self.kinds = frozenset(kinds) if kinds else None
+        self.cursor = hub.last_seq
+        self._replay = False
+        if last_event_id is not None:
+            # An id from the future means the worker restarted: replay what we have
+            self.cursor = last_event_id if 0 <= last_event_id <= hub.last_seq else 0
+            self._replay = True
+        self.closed = hub.closed
+        if not self.closed:
+            hub._subscriptions.add(self)
+
+    async def get(self, batch_s: float = 0.0) -> list[tuple[int, StatusEvent]]:
+        """
+        Wait for and return every (seq, event) pending for this subscriber.
+        With `batch_s` the read is delayed that long after the first event so a
+        burst is returned at once, with superseded state changes dropped.
+        """
+        await self.hub.wait_after(self.cursor)
+        if batch_s > 0:
+            await asyncio.sleep(batch_s)
+        limit = self.hub.retained if self._replay else self.maxlen
+        self._replay = False
+        self.cursor, msgs = self.hub.read_after(self.cursor, limit)
+        if self.kinds is not None:
+            msgs = [(seq, event) for seq, event in msgs if event.kind in self.kinds]
+        if self.policy == COALESCE and len(msgs) > 1:
+            msgs = _coalesce(msgs)
+        elif batch_s > 0 and len(msgs) > 1:
+            msgs = _coalesce(msgs, SUPERSEDED_KINDS)
+        return msgs
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.hub._subscriptions.discard(self)
+
+
+def _coalesce(msgs: list[tuple[int, StatusEvent]],
+              kinds: Optional[frozenset[str]] = None) -> list[tuple[int, StatusEvent]]:
+    """
+    Keep only the latest event per (kind, agent, session), in order. Only
+    `kinds` are merged when given; free-form text is never merged.
+    """
+    latest: dict[Any, int] = {}
+    for i, (seq, event) in enumerate(msgs):
+        merge = event.kind != STATUS if kinds is None else event.kind in kinds
+        latest[(event.kind, event.agent, event.session) if merge else seq] = i
+    keep = sorted(latest.values())
+    return [msgs[i] for i in keep]
+
+
+class StatusWriter:
+    """
+    Background thread that takes status events off the hot path.
+
+    Callers only append to a deque (atomic under the GIL, never blocks) and set
+    a wakeup event if the writer is idle. The writer drains everything that
+    queued up, serializes and publishes it to the hub and echoes the whole
+    batch to stdout with a single write and flush.
+    """
+
+    def __init__(self, hub: StatusHub, stream: Optional[TextIO] = None) -> None:
+        self.hub = hub
+        self.stream = stream
+        self.inbox: deque[StatusEvent] = deque()
+        self.wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="status-writer", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            self.wakeup.wait()
+            # Clear before draining so a message appended after the drain re-arms the event
+            self.wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Publish and echo everything queued so far."""
+        inbox = self.inbox
+        lines = []
+        while inbox:
+            event = inbox.popleft()
+            self.hub.publish(event)
+            if event.session is not None:
+                # Sessions are opened by set_status_session; late events of a closed one are not resurrected
+                session_hub = _session_hubs.get(event.session)
+                if session_hub is not None:
+                    session_hub.publish(event)
+            lines.append(event.data)
+        if lines and self.stream is not None:
+            try:
+                self.stream.write("push_status " + "\npush_status ".join(lines) + "\n")
+                self.stream.flush()
+            except (OSError, ValueError):
+                # stdout closed at interpreter shutdown
+                pass
+
+
+_status_hub: Optional[StatusHub] = None
+# Per-session hubs, so one room's burst never evicts another room's events
+_session_hubs: dict[str, StatusHub] = {}
+_session_hubs_lock = threading.Lock()
+_api_loop: Optional[asyncio.AbstractEventLoop] = None
+# Session (LiveKit room) the current job runs in; read by push_event
+_current_session: ContextVar[Optional[str]] = ContextVar("status_session", default=None)
+_status_writer: Optional[StatusWriter] = None
+_status_level = logging.getLevelName(os.getenv(STATUS_LEVEL_ENV, "INFO").upper())
+if not isinstance(_status_level, int):
+    _status_level = logging.INFO
 
 
 def init(loop: asyncio.AbstractEventLoop | None = None) -> None:
     """
-    Call once from the *async* thread (FastAPI lifespan) to create the queue.
+    Call once from the *async* thread (FastAPI lifespan) to bind the hub to the
+    loop that serves the SSE subscribers.
     """
-    global _status_queue
-    if _status_queue is None:
-        if loop is None:                      # default: current running loop
-            loop = asyncio.get_running_loop()
-        _status_queue = janus.Queue()
+    global _api_loop
+    if loop is None:                      # default: current running loop
+        loop = asyncio.get_running_loop()
+    _api_loop = loop
+    get_status_hub().bind(loop)
+    with _session_hubs_lock:
+        for hub in _session_hubs.values():
+            hub.bind(loop)
+
+
+# Shared status hub for SSE (any thread publishes, the API loop subscribes)
+def get_status_hub(session: Optional[str] = None) -> StatusHub:
+    """The process-wide hub, or the hub of a single session when `session` is given."""
+    global _status_hub
+    if session is not None:
+        hub = _session_hubs.get(session)
+        if hub is None:
+            with _session_hubs_lock:
+                hub = _session_hubs.get(session)
+                if hub is None:
+                    hub = _session_hubs[session] = StatusHub()
+                    if _api_loop is not None:
+                        hub.bind(_api_loop)
+        return hub
+    if _status_hub is None:
+        spill = None
+        spill_path = os.getenv(SPILL_PATH_ENV)
+        if spill_path:
+            spill = SpillLog(spill_path, slots=int(os.getenv(SPILL_SLOTS_ENV, DEFAULT_SPILL_SLOTS)))
+        _status_hub = StatusHub(spill=spill)
+    return _status_hub
+
+
+def find_status_hub(session: Optional[str] = None) -> Optional[StatusHub]:
+    """Like get_status_hub, but never creates a session hub: None for unknown or closed sessions."""
+    if session is None:
+        return get_status_hub()
+    return _session_hubs.get(session)
+
+
+def get_status_writer() -> StatusWriter:
+    global _status_writer
+    if _status_writer is None:
+        echo = os.getenv(STATUS_ECHO_ENV, "true").lower() not in ("0", "false", "no")
+        _status_writer = StatusWriter(get_status_hub(), stream=sys.stdout if echo else None)
+        _status_writer.start()
+    return _status_writer
+
+
+def set_status_session(session: Optional[str]) -> Token:
+    """Tag every event pushed from the current context (job task) with `session`."""
+    if session is not None:
+        get_status_hub(session)
+    return _current_session.set(session)
+
+
+def close_status_session(session: str) -> None:
+    """Forget a finished session's hub and end the streams still subscribed to it."""
+    with _session_hubs_lock:
+        hub = _session_hubs.pop(session, None)
+    if hub is not None:
+        hub.close()
+
+
+def status_sessions() -> list[str]:
+    return list(_session_hubs)
+
+
+def status_stats() -> dict[str, int]:
+    """SSE fan-out load across the global and per-session hubs, plus the writer's pending inbox."""
+    hubs = [get_status_hub(), *list(_session_hubs.values())]
+    return {
+        "subscribers": sum(hub.subscribers for hub in hubs),
+        "backlog": max(hub.backlog() for hub in hubs),
+        "dropped": sum(hub.dropped for hub in hubs),
+        "writer_queue": len(_status_writer.inbox) if _status_writer is not None else 0,
+    }
+
+
+def set_status_level(level: int) -> None:
+    """Drop push_status calls below `level` (e.g. logging.WARNING to mute chatter)."""
+    global _status_level
+    _status_level = level
+
+
+def push_event(kind: str, agent: Optional[str] = None, level: int = logging.INFO, **payload: Any) -> None:
+    """Non-blocking push of a typed status event from any thread (sync)."""
+    if level < _status_level:
+        return
+    writer = _status_writer or get_status_writer()
+    writer.inbox.append(StatusEvent(kind, agent, payload or None, _current_session.get()))
+    if not writer.wakeup.is_set():
+        writer.wakeup.set()
 
-# Shared status queue for SSE (sync/async bridge)
-def get_status_queue() -> janus.Queue:
-    if _status_queue is None:
-        raise ValueError("Status queue not initialized")
-    return _status_queue
 
-def push_status(msg: str) -> None:
-    status_queue = get_status_queue()
-    print(f"push_status [{id(status_queue)}]", msg, flush=True)
-    """Thread-safe push to the status queue from any thread (sync)."""
-    status_queue.sync_q.put(msg)
+def push_status(msg: str, level: int = logging.INFO) -> None:
+    """Non-blocking push of a free-form status line from any thread (sync)."""
+    push_event(STATUS, level=level, text=msg)
 
-async def push_status_async(msg: str) -> None:
-    status_queue = get_status_queue()
-    """Async push to the status queue from async code."""
-    print(f"push_status_async [{id(status_queue)}]", msg, flush=True)
-    await status_queue.async_q.put(msg)
 
+async def push_status_async(msg: str, level: int = logging.INFO) -> None:
+    """Async push to the status hub from async code."""
+    push_event(STATUS, level=level, text=msg)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Admission Control - per-agent concurrency limits, bounded queues and circuit breakers
+Sheds load early when an agent is saturated or failing instead of letting requests pile up
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("coordinator.admission")
+
+# In-flight requests allowed per agent
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "32"))
+# Requests allowed to wait for a slot; beyond that new requests are shed immediately
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "64"))
+# Longest a request waits for a slot before it is shed
+AGENT_QUEUE_TIMEOUT = float(os.getenv("AGENT_QUEUE_TIMEOUT", "2"))
+# Consecutive failures that open an agent's breaker, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("AGENT_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("AGENT_BREAKER_COOLDOWN", "10"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class AgentRejected(Exception):
+    """A request was not admitted to an agent (saturated queue or open breaker)"""
+
+    def __init__(self, agent_name: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"Agent {agent_name} rejected the request: {reason}")
+        self.agent_name = agent_name
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failures in a row the breaker opens and rejects
+    requests for `cooldown` seconds. It then goes half-open and lets a single
+    probe request through: success closes it, failure opens it again.
+
+    Every state change starts a new generation. Outcomes are recorded against
+    the generation the request was admitted in and ignored once it is over,
+    so a slow request admitted while closed cannot close an open breaker or
+    push its cooldown back, and only the probe decides a half-open breaker.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.generation = 0
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self.generation += 1
+        self._probing = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def accepting(self) -> bool:
+        """Whether `allow` would let a request through, without claiming the half-open probe"""
+        if self.state == OPEN:
+            return self.retry_after() == 0.0
+        return self.state == CLOSED or not self._probing
+
+    def allow(self) -> bool:
+        if self.state == OPEN and self.retry_after() == 0.0:
+            self._transition(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self.failures = 0
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+
+    def record_failure(self, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened += 1
+            self._transition(OPEN)
+            self._opened_at = time.monotonic()
+
+    def release(self, generation: int) -> None:
+        """The request ended without an outcome (e.g. the client went away)"""
+        if generation == self.generation:
+            self._probing = False
+
+
+class Admission:
+    """One admitted request; mark it failed when the agent answered with a server error"""
+    __slots__ = ("failed", "generation")
+
+    def __init__(self, generation: int) -> None:
+        self.failed = False
+        # Breaker generation the request was admitted in
+        self.generation = generation
+
+    def fail(self) -> None:
+        self.failed = True
+
+
+class AgentGate:
+    """
+    Admission control for one agent: at most `max_concurrency` requests in
+    flight, at most `max_queue` waiting (for up to `queue_timeout` seconds),
+    and a circuit breaker in front of both. Rejections raise AgentRejected
+    right away so the caller can answer 503 instead of queueing unboundedly.
+    """
+
+    def __init__(self, agent_name: str, max_concurrency: int = AGENT_MAX_CONCURRENCY,
+                 max_queue: int = AGENT_MAX_QUEUE, queue_timeout: float = AGENT_QUEUE_TIMEOUT) -> None:
+        self.agent_name = agent_name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.breaker = CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.rejected_open = 0
+
+    def available(self) -> bool:
+        """Whether a new request would be admitted (or queued) rather than rejected right away"""
+        return self.breaker.accepting() and self.in_flight + self.waiting < self.max_concurrency + self.max_queue
+
+    def _reject(self, reason: str, retry_after: float) -> AgentRejected:
+        logger.warning(f"🚧 Shedding request to {self.agent_name}: {reason}")
+        return AgentRejected(self.agent_name, reason, retry_after)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[Admission]:
+        if not self.breaker.allow():
+            self.rejected_open += 1
+            raise self._reject("circuit open", self.breaker.retry_after())
+        admission = Admission(self.breaker.generation)
+
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            self.shed += 1
+            self.breaker.release(admission.generation)
+            raise self._reject("queue full", self.queue_timeout)
+
+        self.waiting += 1
+        try:
+            if self._semaphore.locked():
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            else:
+                # Free slot: take it without scheduling a timeout task
+                await self._semaphore.acquire()
+        except asyncio.TimeoutError:
+            self.shed += 1
+            self.breaker.release(admission.generation)
+            raise self._reject("queue timeout", self.queue_timeout)
+        except BaseException:
+            # Cancelled while queued (e.g. the client went away): give back a half-open probe slot
+            self.breaker.release(admission.generation)
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield admission
+        except httpx.HTTPError:
+            self.breaker.record_failure(admission.generation)
+            raise
+        except BaseException:
+            self.breaker.release(admission.generation)
+            raise
+        else:
+            if admission.failed:
+                self.breaker.record_failure(admission.generation)
+            else:
+                self.breaker.record_success(admission.generation)
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inFlight": self.in_flight,
+            "queueDepth": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "rejectedOpen": self.rejected_open,
+            "breaker": self.breaker.state,
+            "consecutiveFailures": self.breaker.failures,
+            "breakerOpened": self.breaker.opened,
+        }
+
+
+class AdmissionController:
+    """Agent name -> AgentGate, created on first use"""
+
+    def __init__(self, **gate_options: Any) -> None:
+        self.gate_options = gate_options
+        self._gates: Dict[str, AgentGate] = {}
+
+    def gate(self, agent_name: str) -> AgentGate:
+        gate = self._gates.get(agent_name)
+        if gate is None:
+            gate = self._gates[agent_name] = AgentGate(agent_name, **self.gate_options)
+        return gate
+
+    def available(self, agent_name: str) -> bool:
+        gate = self._gates.get(agent_name)
+        return gate is None or gate.available()
+
+    def remove(self, agent_name: str) -> Optional[AgentGate]:
+        return self._gates.pop(agent_name, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: gate.stats() for name, gate in self._gates.items()}
+
+    def any_open(self) -> bool:
+        return any(gate.breaker.state == OPEN for gate in self._gates.values())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for coordinator message forwarding.
+
+Drives the coordinator app in-process and registers the MCP stubs as
+stand-in agents, so every /send-message goes through intent detection,
+routing and the pooled HTTP forwarder to a real stub server.
+
+Start the stubs first (python stubs/gmail-mcp/main.py, ... gcal, gtasks), then:
+    python bench_forward.py [requests] [concurrency]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import statistics
+
+import httpx
+
+import main as coordinator
+
+STUB_AGENTS = {
+    "gmail-stub": (os.getenv("GMAIL_MCP_URL", "http://localhost:9101"), [
+        {"id": "archive_emails", "task": "archive"},
+        {"id": "draft_email", "task": "draft"},
+    ]),
+    "gcal-stub": (os.getenv("GCAL_MCP_URL", "http://localhost:9102"), [
+        {"id": "schedule_meeting", "task": "create_event"},
+        {"id": "create_event", "task": "create_event"},
+    ]),
+    "gtasks-stub": (os.getenv("GTASKS_MCP_URL", "http://localhost:9103"), [
+        {"id": "create_task", "task": "create_task"},
+    ]),
+}
+
+MESSAGES = [
+    "Archive all promotional emails",
+    "Draft a reply to Lucius about the board meeting",
+    "Schedule a meeting with Lucius tomorrow",
+    "Create a task to check the Batmobile",
+]
+
+
+async def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    for name, (url, skills) in STUB_AGENTS.items():
+        coordinator.register_agent(name, {"name": name, "skills": skills}, url)
+    await coordinator.forwarder.start()
+
+    latencies = []
+    statuses = {}
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    transport = httpx.ASGITransport(app=coordinator.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://coordinator") as client:
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                body = {
+                    "messageId": f"bench-{i}",
+                    "parts": [{"kind": "text", "text": MESSAGES[i % len(MESSAGES)]}],
+                }
+                started = time.perf_counter()
+                response = await client.post("/send-message", json=body)
+                latencies.append(time.perf_counter() - started)
+                status = response.json().get("status", response.status_code)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    await coordinator.forwarder.close()
+
+    print(f"requests:    {total} (concurrency {concurrency})")
+    print(f"throughput:  {total / elapsed:.0f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"latency p99: {statistics.quantiles(latencies, n=100)[98] * 1000:.2f} ms")
+    print(f"statuses:    {statuses}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Context Store - bounded conversation contexts for sticky routing
+Remembers the agent and intent each contextId was routed to, with TTL and LRU eviction
+"""
+
+import os
+import sys
+import time
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Optional
+
+logger = logging.getLogger("coordinator.contexts")
+
+# Idle contexts expire after this many seconds
+CONTEXT_TTL_SECONDS = float(os.getenv("CONTEXT_TTL_SECONDS", "3600"))
+# Most contexts kept at once; the least recently used one is evicted beyond that
+CONTEXT_MAX_ENTRIES = int(os.getenv("CONTEXT_MAX_ENTRIES", "10000"))
+# Task (message) ids remembered per context for referenceTaskIds lookups
+MAX_CONTEXT_HISTORY_SIZE = int(os.getenv("MAX_CONTEXT_HISTORY_SIZE", "100"))
+
+
+@dataclass(slots=True)
+class ConversationContext:
+    """Routing state of one conversation"""
+    context_id: str
+    session_id: Optional[str] = None
+    agent_name: Optional[str] = None
+    intent: Optional[str] = None
+    skill: Optional[str] = None
+    turns: int = 0
+    created: float = field(default_factory=time.monotonic)
+    last_active: float = field(default_factory=time.monotonic)
+    task_ids: Deque[str] = field(default_factory=lambda: deque(maxlen=MAX_CONTEXT_HISTORY_SIZE))
+
+    def size(self) -> int:
+        """Approximate memory held by this context in bytes"""
+        strings = (self.context_id, self.session_id, self.agent_name, self.intent, self.skill)
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.task_ids)
+            + sum(sys.getsizeof(s) for s in strings if s is not None)
+            + sum(sys.getsizeof(t) for t in self.task_ids)
+        )
+
+
+class ContextStore:
+    """
+    contextId -> ConversationContext, bounded by a TTL and an LRU cap.
+
+    The OrderedDict is kept in last-use order, so both the least recently used
+    and the longest idle contexts sit at the front: expiry only pops from the
+    front and never scans the whole store. Task ids recorded for a context are
+    indexed so a message that only carries `referenceTaskIds` still finds its
+    conversation.
+    """
+
+    def __init__(self, ttl: float = CONTEXT_TTL_SECONDS, max_entries: int = CONTEXT_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._contexts: OrderedDict[str, ConversationContext] = OrderedDict()
+        self._task_index: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def get(self, context_id: Optional[str], reference_task_ids: Iterable[str] = ()) -> Optional[ConversationContext]:
+        """Live context by id, or by one of the task ids it produced; refreshes its LRU position"""
+        self._expire()
+        context = self._contexts.get(context_id) if context_id else None
+        if context is None:
+            for task_id in reference_task_ids or ():
+                owner = self._task_index.get(task_id)
+                if owner is not None:
+                    context = self._contexts.get(owner)
+                    break
+        if context is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        context.last_active = time.monotonic()
+        self._contexts.move_to_end(context.context_id)
+        return context
+
+    def record(self, context_id: str, agent_name: str, intent: Optional[str], skill: Optional[str],
+               task_id: Optional[str] = None, session_id: Optional[str] = None) -> ConversationContext:
+        """Pin a context to the agent/intent it was just routed to"""
+        context = self._contexts.get(context_id)
+        if context is None:
+            context = self._contexts[context_id] = ConversationContext(context_id, session_id)
+        else:
+            self._contexts.move_to_end(context_id)
+
+        context.agent_name = agent_name
+        context.intent = intent
+        context.skill = skill
+        context.session_id = session_id or context.session_id
+        context.turns += 1
+        context.last_active = time.monotonic()
+
+        if task_id:
+            if len(context.task_ids) == context.task_ids.maxlen and self._task_index.get(context.task_ids[0]) == context_id:
+                del self._task_index[context.task_ids[0]]
+            context.task_ids.append(task_id)
+            self._task_index[task_id] = context_id
+
+        self._expire()
+        while len(self._contexts) > self.max_entries:
+            self._drop(next(iter(self._contexts)))
+            self.evicted += 1
+        return context
+
+    def forget(self, context_id: str) -> None:
+        """Unpin a context (e.g. its agent failed), so the next message is classified again"""
+        if context_id in self._contexts:
+            self._drop(context_id)
+
+    def _drop(self, context_id: str) -> None:
+        context = self._contexts.pop(context_id)
+        for task_id in context.task_ids:
+            if self._task_index.get(task_id) == context_id:
+                del self._task_index[task_id]
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.ttl
+        while self._contexts:
+            context_id, context = next(iter(self._contexts.items()))
+            if context.last_active > deadline:
+                break
+            self._drop(context_id)
+            self.expired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire()
+        return {
+            "contexts": len(self._contexts),
+            "maxContexts": self.max_entries,
+            "taskIds": len(self._task_index),
+            "approxBytes": sum(c.size() for c in self._contexts.values()) + sys.getsizeof(self._task_index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Agent Forwarder - pooled HTTP forwarding of routed messages to service agents
+One shared keep-alive client for every agent, behind per-agent admission control
+"""
+
+import os
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from admission import AdmissionController
+
+logger = logging.getLogger("coordinator.forwarding")
+
+# Path on the agent that accepts routed tasks (the MCP stubs serve /invoke)
+FORWARD_PATH = os.getenv("AGENT_FORWARD_PATH", "/invoke")
+FORWARD_TIMEOUT = float(os.getenv("AGENT_FORWARD_TIMEOUT", "30"))
+FORWARD_CONNECT_TIMEOUT = float(os.getenv("AGENT_CONNECT_TIMEOUT", "5"))
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AgentForwarder:
+    """
+    Forwards routed messages to agents over one shared httpx.AsyncClient.
+
+    The client keeps connections alive (HTTP/2 when `h2` is installed, so many
+    requests to one agent share a single connection). Every request passes the
+    agent's admission gate (concurrency limit, bounded queue, circuit breaker),
+    so a slow or failing agent can only tie up its own share of the pool; a
+    rejected request raises AgentRejected. Server errors and transport
+    failures count against the agent's breaker.
+    """
+
+    def __init__(self, admission: Optional[AdmissionController] = None) -> None:
+        self.admission = admission or AdmissionController()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        http2 = _http2_available()
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(FORWARD_TIMEOUT, connect=FORWARD_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=64, keepalive_expiry=60),
+        )
+        logger.info(f"🔌 Agent forwarder ready (http2={http2})")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Agent forwarder not started")
+        return self._client
+
+    async def forward(self, agent_name: str, agent_url: str, payload: Dict[str, Any]) -> httpx.Response:
+        """Send a routed task to the agent and return its complete response"""
+        async with self.admission.gate(agent_name).admit() as admission:
+            response = await self.client.post(agent_url.rstrip("/") + FORWARD_PATH, json=payload)
+            if response.status_code >= 500:
+                admission.fail()
+            return response
+
+    @asynccontextmanager
+    async def stream(self, agent_name: str, agent_url: str, payload: Dict[str, Any],
+                     headers: Optional[Dict[str, str]] = None) -> AsyncIterator[httpx.Response]:
+        """Send a routed task and yield the response before its body has been read"""
+        async with self.admission.gate(agent_name).admit() as admission:
+            request = self.client.build_request("POST", agent_url.rstrip("/") + FORWARD_PATH, json=payload,
+                                                headers=headers)
+            response = await self.client.send(request, stream=True)
+            if response.status_code >= 500:
+                admission.fail()
+            try:
+                yield response
+            finally:
+                await response.aclose()
+
+
+def build_task_payload(task: str, text: str, intent: Optional[str], context_id: str,
+                       message: Dict[str, Any]) -> Dict[str, Any]:
+    """Task body for an agent: MCP-style task/parameters plus the original A2A message"""
+    return {
+        "task": task,
+        "parameters": {"text": text, "intent": intent},
+        "contextId": context_id,
+        "message": message,
+    }
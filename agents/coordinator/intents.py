@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Intent Engine - compiled keyword matcher for coordinator message routing
+Scores every matched keyword and picks the best intent with deterministic priority
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("coordinator.intents")
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    """A keyword that votes for an intent/skill pair with a weight"""
+    keyword: str
+    intent: str
+    skill: str
+    weight: float = 1.0
+
+
+# Built-in intent table: action verbs outweigh the nouns they usually come with
+DEFAULT_RULES = [
+    IntentRule("archive", "archive_emails", "archive_emails", 2.0),
+    IntentRule("email", "email_operation", "archive_emails", 1.0),
+    IntentRule("draft", "create_draft", "draft_email", 2.0),
+    IntentRule("reply", "create_draft", "draft_email", 2.0),
+    IntentRule("schedule", "schedule_meeting", "schedule_meeting", 2.0),
+    IntentRule("meeting", "schedule_meeting", "schedule_meeting", 1.0),
+    IntentRule("calendar", "calendar_operation", "create_event", 1.0),
+    IntentRule("event", "create_event", "create_event", 1.0),
+    IntentRule("task", "create_task", "create_task", 1.0),
+    IntentRule("todo", "create_todo", "create_todo", 2.0),
+    IntentRule("reminder", "set_reminder", "set_reminder", 2.0),
+]
+
+# Weight of keywords contributed by registered agents' skill cards
+SKILL_CARD_WEIGHT = 1.0
+
+
+class IntentEngine:
+    """
+    Keyword intent matcher compiled into one regex alternation.
+
+    Every keyword is matched on word boundaries (with an optional plural
+    suffix) in a single pass over the text. The weights of all matches are
+    summed per (intent, skill), and ties go to the pair whose first rule comes
+    earliest in the table, so routing does not depend on dict ordering or on
+    which keyword happens to appear first in the message. Registered agents can
+    contribute rules from their skill cards; the automaton is rebuilt only when
+    the rule set changes.
+    """
+
+    def __init__(self, rules: Iterable[IntentRule] = DEFAULT_RULES) -> None:
+        self._base_rules = list(rules)
+        self._source_rules: Dict[str, List[IntentRule]] = {}
+        self._pattern: Optional[re.Pattern] = None
+        self._keyword_rules: Dict[str, List[Tuple[int, IntentRule]]] = {}
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        rules = list(self._base_rules)
+        for source_rules in self._source_rules.values():
+            rules.extend(source_rules)
+
+        keyword_rules: Dict[str, List[Tuple[int, IntentRule]]] = {}
+        seen = set()
+        for priority, rule in enumerate(rules):
+            # Replicas of one agent contribute identical rules; count each rule once
+            if rule in seen:
+                continue
+            seen.add(rule)
+            keyword_rules.setdefault(rule.keyword.lower(), []).append((priority, rule))
+
+        # Longest keywords first so multi-word phrases win over their prefixes
+        keywords = sorted(keyword_rules, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"\b(" + "|".join(re.escape(k) for k in keywords) + r")(?:e?s)?\b"
+        ) if keywords else None
+        self._keyword_rules = keyword_rules
+
+    def add_skill_rules(self, source: str, skills: Iterable[Dict[str, Any]]) -> None:
+        """Add keywords from an agent card's skills (`keywords` and `tags`), replacing that agent's previous rules"""
+        rules = []
+        for skill in skills:
+            skill_id = skill.get("id")
+            if not skill_id:
+                continue
+            for keyword in list(skill.get("keywords", [])) + list(skill.get("tags", [])):
+                if isinstance(keyword, str) and keyword.strip():
+                    rules.append(IntentRule(keyword.strip().lower(), skill_id, skill_id, SKILL_CARD_WEIGHT))
+        if rules:
+            self._source_rules[source] = rules
+        else:
+            self._source_rules.pop(source, None)
+        self._rebuild()
+
+    def remove_source(self, source: str) -> None:
+        if self._source_rules.pop(source, None) is not None:
+            self._rebuild()
+
+    def match(self, text: str) -> Dict[str, Any]:
+        """Return the best intent/skill for already lower-cased text, with its score"""
+        if self._pattern is None:
+            return {"intent": None, "skill": None, "score": 0.0}
+
+        scores: Dict[Tuple[str, str], List[float]] = {}
+        for m in self._pattern.finditer(text):
+            for priority, rule in self._keyword_rules[m.group(1)]:
+                entry = scores.get((rule.intent, rule.skill))
+                if entry is None:
+                    scores[(rule.intent, rule.skill)] = [rule.weight, priority]
+                else:
+                    entry[0] += rule.weight
+                    entry[1] = min(entry[1], priority)
+
+        if not scores:
+            return {"intent": None, "skill": None, "score": 0.0}
+
+        (intent, skill), (score, _) = max(scores.items(), key=lambda kv: (kv[1][0], -kv[1][1]))
+        return {"intent": intent, "skill": skill, "score": score}
@@ -7,14 +7,29 @@ Handles agent discovery, registration, and message routing
 import os
 import logging
 import asyncio
+import time
+import uuid
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 import docker
 from docker.errors import DockerException
 import httpx
 
+from admission import AgentRejected
+from contexts import ContextStore
+from intents import IntentEngine
+import metrics
+from registry import SkillProvider, SkillRegistry
+from snapshot import EncodedBody, RegistrySnapshot
+from streaming import SSE_HEADERS, SSE_MEDIA_TYPE, STREAM_ACCEPT, TaskEventStream, iter_agent_parts
+from forwarding import AgentForwarder, build_task_payload
+from watcher import AGENT_CARD_PATH, AGENT_HEALTH_PATH, HEALTH_TIMEOUT, DockerEventWatcher, LivenessMonitor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("coordinator")
@@ -27,18 +42,42 @@ app = FastAPI(
 )
 
 # In-memory agent registry
-# Structure: {agent_name: {"card": AgentCard, "url": str, "last_seen": datetime}}
+# Structure: {agent_name: {"card": AgentCard, "url": str, "last_seen": datetime, "healthy": bool}}
 agent_registry: Dict[str, Dict[str, Any]] = {}
 
-# Skill to agent mapping
-# Structure: {skill_id: {"agent_name": str, "agent_url": str, "description": str}}
-skill_registry: Dict[str, Dict[str, Any]] = {}
+# Skill to agent mapping: every skill can have several providers (e.g. replicas of one agent),
+# requests go to the least loaded one
+skill_registry = SkillRegistry()
+
+# Container to agent mapping, so a container's exit unregisters its agent
+# Structure: {container_short_id: agent_name}
+container_agents: Dict[str, str] = {}
+
+# Shared HTTP client for forwarding routed messages to agents
+forwarder = AgentForwarder()
+
+# Agent discovery: per-URL agent card timeout and overall deadline for a discovery pass
+CARD_FETCH_TIMEOUT = float(os.getenv("AGENT_CARD_TIMEOUT", "5"))
+DISCOVERY_DEADLINE = float(os.getenv("DISCOVERY_DEADLINE", "15"))
+# How long a freshly started container gets to start serving its agent card
+AGENT_START_GRACE = float(os.getenv("AGENT_START_GRACE", "30"))
+
+metrics.REGISTERED_AGENTS.set_function(lambda: len(agent_registry))
+metrics.REGISTERED_SKILLS.set_function(lambda: len(skill_registry))
+
+# Conversation contexts: follow-up messages stay with the agent that handled the conversation
+contexts = ContextStore()
+
+# Intent matcher, built once; registered agents add keywords from their skill cards
+intent_engine = IntentEngine()
 
 # Models
 class HealthResponse(BaseModel):
     status: str
     agents: int
     timestamp: str
+    contexts: Optional[Dict[str, Any]] = None
+    admission: Optional[Dict[str, Dict[str, Any]]] = None
 
 
 class AgentCard(BaseModel):
@@ -55,7 +94,7 @@ class AgentCard(BaseModel):
 
 class SkillsResponse(BaseModel):
     """Response model for /skills endpoint"""
-    skills: Dict[str, Dict[str, str]]
+    skills: Dict[str, Dict[str, Any]]
     totalAgents: int
     lastUpdated: str
 
@@ -79,86 +118,74 @@ class MessageResponse(BaseModel):
     targetAgent: Optional[str] = None
     status: str
     message: str
-
-
-@app.get("/.well-known/agent.json", response_model=AgentCard)
-async def get_agent_card():
-    """Return coordinator's A2A agent card"""
-    return AgentCard(
-        name="alfred-coordinator",
-        description="Central orchestration agent for Alfred voice assistant system",
-        provider={
-            "name": "Alfred System",
-            "url": "https://alfred.example.com"
-        },
-        url=f"http://localhost:{os.getenv('COORDINATOR_PORT', '8080')}",
-        version="0.1.0",
-        capabilities={
-            "streaming": False,  # Will add SSE support later
-            "pushNotifications": False
+    result: Optional[Any] = None
+    sticky: bool = False
+
+
+# The coordinator's own card never changes at runtime, so it is encoded once
+COORDINATOR_CARD = AgentCard(
+    name="alfred-coordinator",
+    description="Central orchestration agent for Alfred voice assistant system",
+    provider={
+        "name": "Alfred System",
+        "url": "https://alfred.example.com"
+    },
+    url=f"http://localhost:{os.getenv('COORDINATOR_PORT', '8080')}",
+    version="0.1.0",
+    capabilities={
+        "streaming": True,  # /send-message/stream
+        "pushNotifications": False
+    },
+    authentication={
+        "schemes": ["Bearer", "ApiKey"]
+    },
+    skills=[
+        {
+            "id": "route_message",
+            "name": "Message Routing",
+            "description": "Route messages to appropriate service agents",
+            "inputModes": ["text"],
+            "outputModes": ["text"],
+            "examples": [
+                "Archive all promotional emails",
+                "Schedule a meeting with John tomorrow",
+                "Create a task to buy groceries"
+            ]
         },
-        authentication={
-            "schemes": ["Bearer", "ApiKey"]
-        },
-        skills=[
-            {
-                "id": "route_message",
-                "name": "Message Routing",
-                "description": "Route messages to appropriate service agents",
-                "inputModes": ["text"],
-                "outputModes": ["text"],
-                "examples": [
-                    "Archive all promotional emails",
-                    "Schedule a meeting with John tomorrow",
-                    "Create a task to buy groceries"
-                ]
-            },
-            {
-                "id": "discover_skills",
-                "name": "Skill Discovery",
-                "description": "Discover available skills across all registered agents",
-                "inputModes": ["text"],
-                "outputModes": ["text"],
-                "examples": ["What can you do?", "List available skills"]
-            }
-        ]
-    )
-
-
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Health check endpoint"""
-    return HealthResponse(
-        status="ok",
-        agents=len(agent_registry),
-        timestamp=datetime.utcnow().isoformat()
-    )
+        {
+            "id": "discover_skills",
+            "name": "Skill Discovery",
+            "description": "Discover available skills across all registered agents",
+            "inputModes": ["text"],
+            "outputModes": ["text"],
+            "examples": ["What can you do?", "List available skills"]
+        }
+    ]
+)
+COORDINATOR_CARD_BODY = EncodedBody.encode(COORDINATOR_CARD.model_dump())
 
 
-@app.get("/skills", response_model=SkillsResponse)
-async def get_skills():
-    """Get all available skills across registered agents"""
-    # Build skills response
+def _skills_document(updated_at: str) -> Dict[str, Any]:
     skills_dict = {}
 
-    for skill_id, skill_info in skill_registry.items():
+    for skill_id, providers in skill_registry.items():
+        primary = providers[0]
         skills_dict[skill_id] = {
-            "agentName": skill_info["agent_name"],
-            "agentUrl": skill_info["agent_url"],
-            "description": skill_info["description"],
-            "skillName": skill_info.get("skill_name", skill_id)
+            "agentName": primary.agent_name,
+            "agentUrl": primary.agent_url,
+            "description": primary.description,
+            "skillName": primary.skill_name,
+            "providers": [provider.agent_name for provider in providers]
         }
 
     return SkillsResponse(
         skills=skills_dict,
         totalAgents=len(agent_registry),
-        lastUpdated=datetime.utcnow().isoformat()
-    )
+        lastUpdated=updated_at
+    ).model_dump()
 
 
-@app.get("/agents")
-async def get_agents():
-    """Get all registered agents"""
+def _agents_document(timestamp: str) -> Dict[str, Any]:
     agents_list = []
 
     for agent_name, agent_info in agent_registry.items():
@@ -166,96 +193,333 @@ async def get_agents():
             "name": agent_name,
             "url": agent_info["url"],
             "lastSeen": agent_info["last_seen"].isoformat(),
+            "healthy": agent_info["healthy"],
             "skills": [skill["id"] for skill in agent_info["card"].get("skills", [])]
         })
 
     return {
         "agents": agents_list,
         "total": len(agents_list),
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": timestamp
     }
 
 
+# Encoded /skills and /agents bodies, rebuilt only after the registries change
+registry_snapshot = RegistrySnapshot(_skills_document, _agents_document)
+
+
+@app.get("/.well-known/agent.json", response_model=AgentCard)
+async def get_agent_card(if_none_match: Optional[str] = Header(None)):
+    """Return coordinator's A2A agent card"""
+    return COORDINATOR_CARD_BODY.response(if_none_match)
+
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Health check endpoint"""
+    return HealthResponse(
+        # Degraded while any agent's breaker is open
+        status="degraded" if forwarder.admission.any_open() else "ok",
+        agents=len(agent_registry),
+        timestamp=datetime.utcnow().isoformat(),
+        contexts=contexts.stats(),
+        admission=forwarder.admission.stats()
+    )
+
+
+@app.get("/skills", response_model=SkillsResponse)
+async def get_skills(if_none_match: Optional[str] = Header(None)):
+    """Get all available skills across registered agents (ETag-cached until the registry changes)"""
+    return registry_snapshot.skills().response(if_none_match)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/agents")
+async def get_agents(if_none_match: Optional[str] = Header(None)):
+    """Get all registered agents (ETag-cached until the registry or agent liveness changes)"""
+    return registry_snapshot.agents().response(if_none_match)
+
+
+def message_text(message_request: MessageRequest) -> str:
+    """Lower-cased text of the message's text parts"""
+    return " ".join(
+        part.get("text", "") for part in message_request.parts if part.get("kind") == "text"
+    ).strip().lower()
+
+
 def extract_intent_from_message(message_request: MessageRequest) -> Dict[str, Any]:
     """Extract intent and identify target skill from message"""
-    # Extract text from parts
-    text_content = ""
-    for part in message_request.parts:
-        if part.get("kind") == "text":
-            text_content += part.get("text", "") + " "
-
-    text_content = text_content.strip().lower()
-
-    # Simple keyword-based intent detection
-    intent_mapping = {
-        "archive": {"intent": "archive_emails", "skill": "archive_emails"},
-        "email": {"intent": "email_operation", "skill": "archive_emails"},
-        "draft": {"intent": "create_draft", "skill": "draft_email"},
-        "reply": {"intent": "create_draft", "skill": "draft_email"},
-        "schedule": {"intent": "schedule_meeting", "skill": "schedule_meeting"},
-        "meeting": {"intent": "schedule_meeting", "skill": "schedule_meeting"},
-        "calendar": {"intent": "calendar_operation", "skill": "create_event"},
-        "event": {"intent": "create_event", "skill": "create_event"},
-        "task": {"intent": "create_task", "skill": "create_task"},
-        "todo": {"intent": "create_todo", "skill": "create_todo"},
-        "reminder": {"intent": "set_reminder", "skill": "set_reminder"}
-    }
-
-    # Find matching intent
-    detected_intent = None
-    target_skill = None
+    text_content = message_text(message_request)
 
-    for keyword, mapping in intent_mapping.items():
-        if keyword in text_content:
-            detected_intent = mapping["intent"]
-            target_skill = mapping["skill"]
-            break
+    match = intent_engine.match(text_content)
 
     return {
-        "intent": detected_intent,
-        "skill": target_skill,
+        "intent": match["intent"],
+        "skill": match["skill"],
+        "score": match["score"],
         "text": text_content
     }
 
 
+@dataclass
+class MessageRoute:
+    """Where a message goes: its conversation, intent and the agent chosen for it"""
+    request: MessageRequest
+    context_id: str
+    intent_info: Dict[str, Any]
+    provider: Optional[SkillProvider]
+    sticky: bool
+
+    @property
+    def target_agent(self) -> Optional[str]:
+        return self.provider.agent_name if self.provider else None
+
+    def count(self, status: str) -> None:
+        metrics.SKILL_REQUESTS.labels(self.intent_info["skill"] or "none", status).inc()
+
+    def respond(self, status: str, message: str, result: Any = None) -> MessageResponse:
+        self.count(status)
+        return MessageResponse(
+            messageId=self.request.messageId,
+            contextId=self.context_id,
+            intent=self.intent_info["intent"],
+            targetSkill=self.intent_info["skill"],
+            targetAgent=self.target_agent,
+            status=status,
+            message=message,
+            result=result,
+            sticky=self.sticky
+        )
+
+    def unroutable(self) -> Optional[MessageResponse]:
+        """The response for a message that cannot be routed, or None when it can"""
+        if not self.intent_info["intent"]:
+            return self.respond("unknown", "Could not understand the request. Please try again.")
+        if not self.provider:
+            return self.respond("unrouted", f"No agent available for skill: {self.intent_info['skill']}")
+        return None
+
+    def payload(self) -> Dict[str, Any]:
+        return build_task_payload(
+            self.provider.task, self.intent_info["text"], self.intent_info["intent"], self.context_id,
+            self.request.model_dump()
+        )
+
+    def pin_context(self) -> None:
+        contexts.record(self.context_id, self.target_agent, self.intent_info["intent"], self.intent_info["skill"],
+                        self.request.messageId, self.request.sessionId)
+
+
+def route_message(request: MessageRequest) -> MessageRoute:
+    """Resolve the conversation and pick the target agent for a message"""
+    started = time.perf_counter()
+    # Known conversation (by contextId or a referenced task)? Then use it, otherwise start a new one
+    context = contexts.get(request.contextId, request.referenceTaskIds or ())
+    context_id = request.contextId or (context.context_id if context else f"ctx-{uuid.uuid4().hex}")
+
+    # Always classify: a follow-up may well ask for something else than the conversation so far
+    intent_info = extract_intent_from_message(request)
+
+    # Follow-ups stay with the agent that handled the conversation, as long as it still provides the skill
+    # and the message either matches no intent or matches that same skill
+    provider = None
+    if context and context.skill and intent_info["skill"] in (None, context.skill):
+        provider = skill_registry.provider(context.skill, context.agent_name)
+    sticky = provider is not None
+    if sticky and not intent_info["intent"]:
+        intent_info.update(intent=context.intent, skill=context.skill)
+    elif not sticky:
+        # Pick the least loaded agent providing the skill, passing over agents that would shed the request
+        provider = (
+            skill_registry.choose(intent_info["skill"], forwarder.admission.available) if intent_info["skill"] else None
+        )
+
+    metrics.ROUTING_SECONDS.labels("sticky" if sticky else "classified").observe(time.perf_counter() - started)
+    return MessageRoute(request, context_id, intent_info, provider, sticky)
+
+
 @app.post("/send-message", response_model=MessageResponse)
-async def send_message(request: MessageRequest):
-    """Process incoming message and route to appropriate agent"""
+async def send_message(request: MessageRequest, passthrough: bool = False):
+    """
+    Process incoming message and route it to the appropriate agent.
+    With ?passthrough=true the agent's response is streamed back as-is.
+    """
     logger.info(f"📨 Received message: {request.messageId}")
 
-    # Generate or use existing context ID
-    context_id = request.contextId or f"ctx-{datetime.utcnow().timestamp()}"
+    route = route_message(request)
+    unroutable = route.unroutable()
+    if unroutable:
+        return unroutable
+    target_agent = route.target_agent
+
+    if passthrough:
+        relayed = await _relay_agent_response(target_agent, route.provider.agent_url, route.payload(), {
+            "X-Context-Id": route.context_id,
+            "X-Target-Agent": target_agent,
+            "X-Intent": route.intent_info["intent"],
+        })
+        # Transport failures and rejections already raised; pin only when the agent answered successfully
+        if 200 <= relayed.status_code < 300:
+            route.pin_context()
+        else:
+            contexts.forget(route.context_id)
+        return relayed
 
-    # Extract intent from message
-    intent_info = extract_intent_from_message(request)
+    try:
+        with skill_registry.track(target_agent), metrics.FORWARD_SECONDS.labels(target_agent).time():
+            response = await forwarder.forward(target_agent, route.provider.agent_url, route.payload())
+    except AgentRejected as e:
+        raise _shed(e)
+    except httpx.HTTPError as e:
+        logger.warning(f"⚠️ Forwarding to {target_agent} failed: {e!r}")
+        # Classify the next message again instead of sticking to an unreachable agent
+        contexts.forget(route.context_id)
+        return route.respond("failed", f"Agent {target_agent} is unavailable: {e.__class__.__name__}")
 
-    # Find target agent for the skill
-    target_agent = None
-    target_agent_url = None
+    try:
+        result = response.json()
+    except ValueError:
+        result = response.text
+
+    if response.is_success:
+        route.pin_context()
+        return route.respond("completed", f"Routed to {target_agent} for {route.intent_info['intent']}", result)
+    contexts.forget(route.context_id)
+    return route.respond("failed", f"Agent {target_agent} returned HTTP {response.status_code}", result)
+
+
+@app.post("/send-message/stream")
+async def send_message_stream(request: MessageRequest):
+    """
+    Route a message like /send-message, but answer with Server-Sent Events:
+    a `working` task update, one artifact update per partial result from the
+    agent as it arrives, then a final task update.
+    """
+    logger.info(f"📨 Received streaming message: {request.messageId}")
+
+    route = route_message(request)
+    stream = TaskEventStream(request.messageId, route.context_id)
+    unroutable = route.unroutable()
+    if unroutable:
+        # unroutable() already counted the outcome
+        return StreamingResponse(
+            iter([stream.status(unroutable.status, unroutable.message, final=True)]),
+            media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS
+        )
+
+    target_agent = route.target_agent
+    # Admission happens before the response starts, so overload is still a plain 503
+    stack = AsyncExitStack()
+    stack.enter_context(skill_registry.track(target_agent))
+    stack.enter_context(metrics.FORWARD_SECONDS.labels(target_agent).time())
+    try:
+        upstream = await stack.enter_async_context(forwarder.stream(
+            target_agent, route.provider.agent_url, route.payload(), headers={"Accept": STREAM_ACCEPT}
+        ))
+    except (AgentRejected, httpx.HTTPError) as e:
+        # Unwind with the error so the request is not timed as a completed one
+        await stack.__aexit__(type(e), e, e.__traceback__)
+        if isinstance(e, AgentRejected):
+            raise _shed(e)
+        logger.warning(f"⚠️ Streaming from {target_agent} failed: {e!r}")
+        contexts.forget(route.context_id)
+        route.count("failed")
+        return StreamingResponse(
+            iter([stream.status("failed", f"Agent {target_agent} is unavailable: {e.__class__.__name__}", final=True)]),
+            media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS
+        )
 
-    if intent_info["skill"] and intent_info["skill"] in skill_registry:
-        skill_info = skill_registry[intent_info["skill"]]
-        target_agent = skill_info["agent_name"]
-        target_agent_url = skill_info["agent_url"]
+    return StreamingResponse(
+        _stream_agent_events(route, stream, upstream, stack), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS
+    )
 
-    # For now, just return the parsed intent without routing
-    response_message = f"Intent: {intent_info['intent']}, Target: {target_agent or 'none'}"
 
-    if not intent_info["intent"]:
-        response_message = "Could not understand the request. Please try again."
-    elif not target_agent:
-        response_message = f"No agent available for skill: {intent_info['skill']}"
+async def _stream_agent_events(route: MessageRoute, stream: TaskEventStream, upstream: httpx.Response,
+                               stack: AsyncExitStack):
+    """
+    Relay the agent's reply as SSE frames. The agent is read one chunk at a time
+    and only after the previous frame has been sent, so a slow client slows the
+    agent down instead of the coordinator buffering its reply.
+    """
+    target_agent = route.target_agent
+    error = None
+    try:
+        yield stream.status("working", f"Routed to {target_agent} for {route.intent_info['intent']}", extra={
+            "targetAgent": target_agent,
+            "targetSkill": route.intent_info["skill"],
+            "intent": route.intent_info["intent"],
+            "sticky": route.sticky,
+        })
+        async for part in iter_agent_parts(upstream):
+            yield stream.artifact(part)
+    except httpx.HTTPError as e:
+        error = e
+    finally:
+        if error is not None:
+            # Let the admission gate see the failure so it counts against the agent's breaker
+            await stack.__aexit__(type(error), error, error.__traceback__)
+        else:
+            await stack.aclose()
+
+    if error is not None:
+        logger.warning(f"⚠️ Streaming from {target_agent} failed: {error!r}")
+        contexts.forget(route.context_id)
+        route.count("failed")
+        yield stream.status("failed", f"Agent {target_agent} failed mid-stream: {error.__class__.__name__}", final=True)
+    elif upstream.is_success:
+        route.pin_context()
+        route.count("completed")
+        yield stream.status("completed", f"{target_agent} finished {route.intent_info['intent']}", final=True)
     else:
-        response_message = f"Would route to {target_agent} for {intent_info['intent']}"
-
-    return MessageResponse(
-        messageId=request.messageId,
-        contextId=context_id,
-        intent=intent_info["intent"],
-        targetSkill=intent_info["skill"],
-        targetAgent=target_agent,
-        status="parsed" if intent_info["intent"] else "unknown",
-        message=response_message
+        contexts.forget(route.context_id)
+        route.count("failed")
+        yield stream.status("failed", f"Agent {target_agent} returned HTTP {upstream.status_code}", final=True)
+
+
+def _shed(rejected: AgentRejected) -> HTTPException:
+    """Fast 503 for a request the agent's admission gate turned away"""
+    metrics.SHED_REQUESTS.labels(rejected.agent_name, rejected.reason).inc()
+    return HTTPException(
+        status_code=503,
+        detail=f"Agent {rejected.agent_name} is not accepting requests ({rejected.reason})",
+        headers={"Retry-After": rejected.retry_after_header}
+    )
+
+
+async def _relay_agent_response(agent_name: str, agent_url: str, payload: Dict[str, Any],
+                                headers: Dict[str, str]) -> StreamingResponse:
+    """Stream the agent's response body to the client as chunks arrive"""
+    stack = AsyncExitStack()
+    # The request stays outstanding until the relayed stream is finished
+    stack.enter_context(skill_registry.track(agent_name))
+    stack.enter_context(metrics.FORWARD_SECONDS.labels(agent_name).time())
+    try:
+        upstream = await stack.enter_async_context(forwarder.stream(agent_name, agent_url, payload))
+    except (AgentRejected, httpx.HTTPError) as e:
+        # Unwind with the error so the request is not timed as a completed one
+        await stack.__aexit__(type(e), e, e.__traceback__)
+        if isinstance(e, AgentRejected):
+            raise _shed(e)
+        raise HTTPException(status_code=502, detail=f"Agent {agent_name} is unavailable: {e.__class__.__name__}")
+
+    async def relay():
+        try:
+            async for chunk in upstream.aiter_bytes():
+                yield chunk
+        finally:
+            await stack.aclose()
+
+    return StreamingResponse(
+        relay(),
+        status_code=upstream.status_code,
+        media_type=upstream.headers.get("content-type"),
+        headers=headers
     )
 
 
@@ -267,20 +531,17 @@ def register_agent(agent_name: str, agent_card: Dict[str, Any], agent_url: str):
     agent_registry[agent_name] = {
         "card": agent_card,
         "url": agent_url,
-        "last_seen": datetime.utcnow()
+        "last_seen": datetime.utcnow(),
+        "healthy": True
     }
 
-    # Extract and register skills
-    for skill in agent_card.get("skills", []):
-        skill_id = skill.get("id")
-        if skill_id:
-            skill_registry[skill_id] = {
-                "agent_name": agent_name,
-                "agent_url": agent_url,
-                "description": skill.get("description", ""),
-                "skill_name": skill.get("name", skill_id)
-            }
-            logger.info(f"  ✅ Registered skill: {skill_id}")
+    # Extract and register skills (replacing the agent's previous ones)
+    for skill_id in skill_registry.register(agent_name, agent_url, agent_card.get("skills", [])):
+        providers = len(skill_registry.providers(skill_id))
+        logger.info(f"  ✅ Registered skill: {skill_id}" + (f" ({providers} providers)" if providers > 1 else ""))
+
+    intent_engine.add_skill_rules(agent_name, agent_card.get("skills", []))
+    registry_snapshot.invalidate()
 
     logger.info(f"✨ Agent {agent_name} registered with {len(agent_card.get('skills', []))} skills")
 
@@ -289,19 +550,17 @@ def unregister_agent(agent_name: str):
     """Remove an agent and its skills from the registry"""
     logger.info(f"🗑️ Unregistering agent: {agent_name}")
 
-    # Remove skills associated with this agent
-    skills_to_remove = [
-        skill_id for skill_id, info in skill_registry.items()
-        if info["agent_name"] == agent_name
-    ]
-
-    for skill_id in skills_to_remove:
-        del skill_registry[skill_id]
+    # Remove skills associated with this agent; skills other agents still provide stay routable
+    for skill_id in skill_registry.unregister(agent_name):
         logger.info(f"  ❌ Removed skill: {skill_id}")
 
+    intent_engine.remove_source(agent_name)
+    forwarder.admission.remove(agent_name)
+
     # Remove agent
     if agent_name in agent_registry:
         del agent_registry[agent_name]
+    registry_snapshot.invalidate()
 
     logger.info(f"✨ Agent {agent_name} unregistered")
 
@@ -318,6 +577,44 @@ def get_docker_client():
         return None
 
 
+def _container_info(container) -> Dict[str, Any]:
+    """Registry-relevant info of a Docker container"""
+    container_info = {
+        "name": container.name,
+        "id": container.short_id,
+        "status": container.status,
+        "labels": container.labels,
+        "network": None
+    }
+
+    # Try to get network info
+    if container.attrs.get("NetworkSettings", {}).get("Networks"):
+        # Get the first network (usually bridge or custom)
+        network_name = list(container.attrs["NetworkSettings"]["Networks"].keys())[0]
+        network_info = container.attrs["NetworkSettings"]["Networks"][network_name]
+        container_info["network"] = {
+            "name": network_name,
+            "ip": network_info.get("IPAddress", ""),
+            "aliases": network_info.get("Aliases", [])
+        }
+
+    return container_info
+
+
+def inspect_agent_container(container_id: str) -> Optional[Dict[str, Any]]:
+    """Info of a single container by id (blocking Docker SDK call)"""
+    client = get_docker_client()
+    if not client:
+        return None
+    try:
+        return _container_info(client.containers.get(container_id))
+    except Exception as e:
+        logger.error(f"❌ Error inspecting container {container_id[:12]}: {e}")
+        return None
+    finally:
+        client.close()
+
+
 def discover_agent_containers() -> List[Dict[str, Any]]:
     """Discover containers with agent=true label"""
     client = get_docker_client()
@@ -332,27 +629,7 @@ def discover_agent_containers() -> List[Dict[str, Any]]:
 
         agent_containers = []
         for container in containers:
-            # Get container info
-            container_info = {
-                "name": container.name,
-                "id": container.short_id,
-                "status": container.status,
-                "labels": container.labels,
-                "network": None
-            }
-
-            # Try to get network info
-            if container.attrs.get("NetworkSettings", {}).get("Networks"):
-                # Get the first network (usually bridge or custom)
-                network_name = list(container.attrs["NetworkSettings"]["Networks"].keys())[0]
-                network_info = container.attrs["NetworkSettings"]["Networks"][network_name]
-                container_info["network"] = {
-                    "name": network_name,
-                    "ip": network_info.get("IPAddress", ""),
-                    "aliases": network_info.get("Aliases", [])
-                }
-
-            agent_containers.append(container_info)
+            agent_containers.append(_container_info(container))
             logger.info(f"🐳 Found agent container: {container.name} ({container.short_id})")
 
         return agent_containers
@@ -362,8 +639,8 @@ def discover_agent_containers() -> List[Dict[str, Any]]:
         return []
 
 
-async def fetch_agent_card(container_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Fetch agent card from container"""
+def _candidate_card_urls(container_info: Dict[str, Any]) -> List[str]:
+    """Agent card URLs to try for a container, most likely first"""
     container_name = container_info["name"]
 
     # Try different URL patterns
@@ -386,72 +663,222 @@ async def fetch_agent_card(container_info: Dict[str, Any]) -> Optional[Dict[str,
             urls_to_try.insert(0, f"http://{container_info['network']['ip']}:{port}/.well-known/agent.json")
         urls_to_try.insert(0, f"http://{container_name}:{port}/.well-known/agent.json")
 
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for url in urls_to_try:
-            try:
-                logger.info(f"🔍 Trying to fetch agent card from: {url}")
-                response = await client.get(url)
+    return urls_to_try
 
-                if response.status_code == 200:
-                    agent_card = response.json()
-                    logger.info(f"✅ Successfully fetched agent card from {container_name}")
-                    return agent_card
 
-            except Exception as e:
-                logger.debug(f"Failed to fetch from {url}: {e}")
-                continue
+async def _get_agent_card(client: httpx.AsyncClient, url: str) -> Dict[str, Any]:
+    response = await client.get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_agent_card(container_info: Dict[str, Any],
+                           client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fetch agent card from container.
+    All candidate URLs are requested at once; the first valid card wins and
+    the remaining requests are cancelled.
+    """
+    container_name = container_info["name"]
+    urls_to_try = _candidate_card_urls(container_info)
+
+    async with AsyncExitStack() as stack:
+        if client is None:
+            client = await stack.enter_async_context(httpx.AsyncClient(timeout=CARD_FETCH_TIMEOUT))
+
+        attempts = {asyncio.create_task(_get_agent_card(client, url)): url for url in urls_to_try}
+        pending = set(attempts)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    url = attempts[attempt]
+                    try:
+                        agent_card = attempt.result()
+                    except Exception as e:
+                        logger.debug(f"Failed to fetch from {url}: {e}")
+                        continue
+                    logger.info(f"✅ Successfully fetched agent card from {container_name} ({url})")
+                    return agent_card
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
     logger.warning(f"⚠️ Could not fetch agent card from container {container_name}")
     return None
 
 
-async def discover_and_register_agents():
-    """Discover agent containers and register them"""
-    logger.info("🔍 Starting agent discovery...")
+def _agent_url_from_container(container: Dict[str, Any], agent_card: Dict[str, Any]) -> str:
+    """Agent URL from its card, or constructed from container info"""
+    agent_url = agent_card.get("url")
+    if agent_url:
+        return agent_url
+    port = container.get("labels", {}).get("agent.port", "8080")
+    if container.get("network") and container["network"].get("ip"):
+        return f"http://{container['network']['ip']}:{port}"
+    return f"http://{container['name']}:{port}"
+
+
+def register_container_agent(container: Dict[str, Any], agent_card: Dict[str, Any]) -> str:
+    """Register the agent served by a container and remember which container it runs in"""
+    # Use the card name as agent name; replicas sharing a card name are told apart by container name
+    agent_name = agent_card.get("name", container["name"])
+    agent_url = _agent_url_from_container(container, agent_card)
+    owner = next((cid for cid, name in container_agents.items() if name == agent_name), None)
+    if owner is not None and owner != container["id"]:
+        # The card's url is shared by all replicas, so address this one directly
+        agent_name = f"{agent_name}@{container['name']}"
+        agent_url = _agent_url_from_container(container, {})
+    register_agent(agent_name, agent_card, agent_url)
+    container_agents[container["id"]] = agent_name
+    return agent_name
+
+
+def expire_agent(agent_name: str):
+    """
+    Stop routing to an agent that missed its health checks. It stays in the
+    registry (and its container mapping stays) so it can recover: Docker sends
+    no new `start` event for a container that is still running.
+    """
+    logger.info(f"🩺 Withdrawing skills of unhealthy agent: {agent_name}")
+    for skill_id in skill_registry.unregister(agent_name):
+        logger.info(f"  ❌ Removed skill: {skill_id}")
+    intent_engine.remove_source(agent_name)
+    forwarder.admission.remove(agent_name)
+    registry_snapshot.invalidate()
+
+
+def restore_agent(agent_name: str):
+    """Re-register an unhealthy agent that answers its health check again"""
+    agent_info = agent_registry.get(agent_name)
+    if agent_info is not None:
+        register_agent(agent_name, agent_info["card"], agent_info["url"])
+
+
+async def on_container_start(container_id: str):
+    """Docker `start` event: register the agent once its card is being served"""
+    started = time.perf_counter()
+    container = await asyncio.to_thread(inspect_agent_container, container_id)
+    if not container:
+        return
+
+    # The process may still be binding its port, so retry until the grace period runs out
+    deadline = time.monotonic() + AGENT_START_GRACE
+    delay = 0.1
+    async with httpx.AsyncClient(timeout=CARD_FETCH_TIMEOUT) as client:
+        while True:
+            agent_card = await fetch_agent_card(container, client)
+            if agent_card:
+                agent_name = register_container_agent(container, agent_card)
+                metrics.DISCOVERY_SECONDS.labels("event").observe(time.perf_counter() - started)
+                logger.info(f"🟢 Container {container['name']} started, agent {agent_name} is live")
+                return
+            if time.monotonic() + delay > deadline:
+                logger.warning(f"⚠️ Container {container['name']} started but never served an agent card")
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+
+async def on_container_die(container_id: str):
+    """Docker `die` event: unregister the container's agent unless another container still serves it"""
+    agent_name = container_agents.pop(container_id[:12], None)
+    if agent_name is None:
+        return
+    logger.info(f"🔴 Container {container_id[:12]} stopped (agent {agent_name})")
+    if agent_name not in container_agents.values():
+        unregister_agent(agent_name)
+
+
+async def probe_agent(agent_name: str, agent_url: str) -> bool:
+    """
+    Cheap liveness probe: GET the agent's health endpoint on the pooled client.
+    Agents without one (404) are probed through their agent card instead.
+    """
+    base_url = agent_url.rstrip("/")
+    try:
+        response = await forwarder.client.get(base_url + AGENT_HEALTH_PATH, timeout=HEALTH_TIMEOUT)
+        if response.status_code == 404:
+            response = await forwarder.client.get(base_url + AGENT_CARD_PATH, timeout=HEALTH_TIMEOUT)
+        return response.is_success
+    except httpx.HTTPError:
+        return False
 
-    # Get list of agent containers
-    containers = discover_agent_containers()
-    logger.info(f"Found {len(containers)} agent containers")
 
-    # Fetch agent cards and register
-    for container in containers:
-        agent_card = await fetch_agent_card(container)
-        if agent_card:
-            # Use container name as agent name
-            agent_name = agent_card.get("name", container["name"])
+event_watcher = DockerEventWatcher(get_docker_client, on_container_start, on_container_die)
+liveness = LivenessMonitor(agent_registry, probe_agent, expire_agent, on_refreshed=registry_snapshot.touch,
+                           on_recovered=restore_agent)
 
-            # Determine agent URL
-            agent_url = agent_card.get("url")
-            if not agent_url:
-                # Construct URL from container info
-                if container.get("network") and container["network"].get("ip"):
-                    port = container.get("labels", {}).get("agent.port", "8080")
-                    agent_url = f"http://{container['network']['ip']}:{port}"
-                else:
-                    port = container.get("labels", {}).get("agent.port", "8080")
-                    agent_url = f"http://{container['name']}:{port}"
 
-            # Register the agent
-            register_agent(agent_name, agent_card, agent_url)
+async def discover_and_register_agents(deadline: float = DISCOVERY_DEADLINE):
+    """
+    Discover agent containers and register them.
+    Agent cards are fetched from all containers concurrently; containers that
+    have not answered within `deadline` seconds are skipped.
+    """
+    logger.info("🔍 Starting agent discovery...")
+    started = time.perf_counter()
 
-    logger.info(f"✨ Agent discovery complete. Registered {len(agent_registry)} agents")
+    # Get list of agent containers (the Docker SDK blocks, so keep it off the loop)
+    containers = await asyncio.to_thread(discover_agent_containers)
+    logger.info(f"Found {len(containers)} agent containers")
+    if not containers:
+        return
+
+    async with httpx.AsyncClient(timeout=CARD_FETCH_TIMEOUT) as client:
+        fetches = [asyncio.create_task(fetch_agent_card(container, client)) for container in containers]
+        _, pending = await asyncio.wait(fetches, timeout=deadline)
+        for fetch in pending:
+            fetch.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # Register in container order so registration is deterministic
+    for container, fetch in zip(containers, fetches):
+        if fetch.cancelled():
+            logger.warning(f"⏱️ Discovery deadline ({deadline}s) passed before {container['name']} answered")
+            continue
+        agent_card = fetch.result()
+        if agent_card:
+            register_container_agent(container, agent_card)
+
+    metrics.DISCOVERY_SECONDS.labels("scan").observe(time.perf_counter() - started)
+    logger.info(
+        f"✨ Agent discovery complete in {time.perf_counter() - started:.2f}s. "
+        f"Registered {len(agent_registry)} agents"
+    )
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize coordinator on startup"""
     logger.info("🚀 Coordinator starting up...")
+    await forwarder.start()
     logger.info("📍 Ready to discover agents")
 
     # Test Docker connection
-    client = get_docker_client()
+    client = await asyncio.to_thread(get_docker_client)
     if client:
         logger.info("✅ Docker connection established")
-        # Start initial agent discovery
+        # Initial scan, then follow container events (replaying any that arrive during the scan)
+        scan_started = time.time()
         await discover_and_register_agents()
+        event_watcher.start(asyncio.get_running_loop(), since=scan_started)
     else:
         logger.warning("⚠️ Docker connection failed - agent discovery disabled")
 
+    liveness.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the registry watchers and release pooled connections on shutdown"""
+    event_watcher.stop()
+    await liveness.stop()
+    await forwarder.close()
+
 
 if __name__ == "__main__":
     import uvicorn
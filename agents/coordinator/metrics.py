@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Coordinator Metrics - Prometheus instruments for routing, discovery and forwarding
+Exposed in the text exposition format on GET /metrics
+"""
+
+from typing import Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Routing decisions are in-process work: sub-millisecond buckets
+ROUTING_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+DISCOVERY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0)
+
+ROUTING_SECONDS = Histogram(
+    "coordinator_routing_seconds",
+    "Time to resolve a message's context, intent and target agent",
+    ["mode"],  # sticky or classified
+    buckets=ROUTING_BUCKETS,
+)
+FORWARD_SECONDS = Histogram(
+    "coordinator_forward_seconds",
+    "Time from forwarding a message to an agent until its response (or stream) completed",
+    ["agent"],
+)
+DISCOVERY_SECONDS = Histogram(
+    "coordinator_discovery_seconds",
+    "Agent discovery time: a full container scan, or one container from start event to registration",
+    ["trigger"],  # scan or event
+    buckets=DISCOVERY_BUCKETS,
+)
+SKILL_REQUESTS = Counter(
+    "coordinator_skill_requests_total",
+    "Messages per target skill and outcome",
+    ["skill", "status"],
+)
+SHED_REQUESTS = Counter(
+    "coordinator_shed_requests_total",
+    "Requests rejected by an agent's admission gate",
+    ["agent", "reason"],
+)
+REGISTERED_AGENTS = Gauge("coordinator_registered_agents", "Agents currently in the registry")
+REGISTERED_SKILLS = Gauge("coordinator_registered_skills", "Skills with at least one provider")
+
+
+def render() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
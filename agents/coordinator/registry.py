@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Skill Registry - indexed skill to agent mapping for the coordinator
+Several agents can provide one skill; requests go to the least loaded provider
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger("coordinator.registry")
+
+LEAST_OUTSTANDING = "least_outstanding"
+EWMA_LATENCY = "ewma"
+STRATEGIES = (LEAST_OUTSTANDING, EWMA_LATENCY)
+
+# Provider selection strategy (least_outstanding or ewma)
+SKILL_ROUTING_STRATEGY = os.getenv("SKILL_ROUTING_STRATEGY", LEAST_OUTSTANDING)
+# Smoothing factor for the per-agent latency average
+EWMA_ALPHA = float(os.getenv("SKILL_EWMA_ALPHA", "0.3"))
+
+
+@dataclass
+class SkillProvider:
+    """One agent offering a skill"""
+    agent_name: str
+    agent_url: str
+    description: str
+    skill_name: str
+    # Task name the agent expects for this skill (defaults to the skill id)
+    task: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "agent_name": self.agent_name,
+            "agent_url": self.agent_url,
+            "description": self.description,
+            "skill_name": self.skill_name,
+            "task": self.task,
+        }
+
+
+@dataclass
+class AgentLoad:
+    """Requests in flight to an agent and its smoothed latency"""
+    outstanding: int = 0
+    ewma_ms: Optional[float] = None
+    requests: int = 0
+
+    def score(self, strategy: str) -> float:
+        if strategy == EWMA_LATENCY:
+            # Unmeasured agents score 0 so they get probed first;
+            # (outstanding + 1) keeps a fast agent from attracting every request at once
+            return (self.ewma_ms or 0.0) * (self.outstanding + 1)
+        return float(self.outstanding)
+
+
+class SkillRegistry:
+    """
+    Skill id -> providers, with a reverse agent -> skill ids index.
+
+    Registering an agent replaces its previous skills and unregistering it
+    touches only its own k skills instead of scanning the whole table. Each
+    skill keeps its providers in registration order; `choose` picks the one
+    with the lowest load score and rotates between equally loaded providers.
+    Load is tracked per agent (not per skill), since that is what an agent's
+    capacity is shared by.
+    """
+
+    def __init__(self, strategy: str = SKILL_ROUTING_STRATEGY) -> None:
+        if strategy not in STRATEGIES:
+            logger.warning(f"⚠️ Unknown skill routing strategy {strategy!r}, using {LEAST_OUTSTANDING}")
+            strategy = LEAST_OUTSTANDING
+        self.strategy = strategy
+        self._skills: Dict[str, Dict[str, SkillProvider]] = {}
+        self._agent_skills: Dict[str, Set[str]] = {}
+        self._load: Dict[str, AgentLoad] = {}
+        self._turn = 0
+
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self._skills
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def register(self, agent_name: str, agent_url: str, skills: Iterable[Dict[str, Any]]) -> List[str]:
+        """Register an agent's skills (replacing any it registered before) and return their ids"""
+        self.unregister(agent_name)
+
+        skill_ids: Set[str] = set()
+        for skill in skills:
+            skill_id = skill.get("id")
+            if not skill_id:
+                continue
+            self._skills.setdefault(skill_id, {})[agent_name] = SkillProvider(
+                agent_name=agent_name,
+                agent_url=agent_url,
+                description=skill.get("description", ""),
+                skill_name=skill.get("name", skill_id),
+                task=skill.get("task", skill_id),
+            )
+            skill_ids.add(skill_id)
+
+        self._agent_skills[agent_name] = skill_ids
+        self._load.setdefault(agent_name, AgentLoad())
+        return sorted(skill_ids)
+
+    def unregister(self, agent_name: str) -> List[str]:
+        """Remove an agent from every skill it provides; returns the skill ids left without a provider"""
+        removed = []
+        for skill_id in self._agent_skills.pop(agent_name, ()):
+            providers = self._skills.get(skill_id)
+            if providers is None:
+                continue
+            providers.pop(agent_name, None)
+            if not providers:
+                del self._skills[skill_id]
+                removed.append(skill_id)
+        self._load.pop(agent_name, None)
+        return sorted(removed)
+
+    def provider(self, skill_id: str, agent_name: Optional[str]) -> Optional[SkillProvider]:
+        """A specific agent's registration for a skill, if it still provides it"""
+        return self._skills.get(skill_id, {}).get(agent_name)
+
+    def providers(self, skill_id: str) -> List[SkillProvider]:
+        return list(self._skills.get(skill_id, {}).values())
+
+    def agent_skills(self, agent_name: str) -> List[str]:
+        return sorted(self._agent_skills.get(agent_name, ()))
+
+    def items(self) -> Iterator[Tuple[str, List[SkillProvider]]]:
+        for skill_id, providers in self._skills.items():
+            yield skill_id, list(providers.values())
+
+    def choose(self, skill_id: str,
+               available: Optional[Callable[[str], bool]] = None) -> Optional[SkillProvider]:
+        """
+        Provider for a request to `skill_id`, by the configured load strategy.
+        Agents for which `available(agent_name)` is false (open breaker, full
+        queue) are passed over unless no provider is available.
+        """
+        providers = self._skills.get(skill_id)
+        if not providers:
+            return None
+        candidates = list(providers.values())
+        if available is not None and len(candidates) > 1:
+            candidates = [p for p in candidates if available(p.agent_name)] or candidates
+        if len(candidates) == 1:
+            return candidates[0]
+
+        scores = [self._load[p.agent_name].score(self.strategy) for p in candidates]
+        best = min(scores)
+        tied = [p for p, score in zip(candidates, scores) if score == best]
+        self._turn += 1
+        return tied[self._turn % len(tied)]
+
+    @contextmanager
+    def track(self, agent_name: str) -> Iterator[None]:
+        """
+        Count a request as outstanding for its duration and, if it completes,
+        fold its latency into the agent's EWMA. Requests that end in an
+        exception (rejected by admission control, transport failure) are not
+        timed: a fast rejection would make a failing agent look fast.
+        """
+        load = self._load.get(agent_name)
+        if load is None:
+            yield
+            return
+        load.outstanding += 1
+        started = time.perf_counter()
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            load.outstanding -= 1
+            if completed:
+                self._observe(load, (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _observe(load: AgentLoad, elapsed_ms: float) -> None:
+        load.requests += 1
+        load.ewma_ms = elapsed_ms if load.ewma_ms is None else (
+            EWMA_ALPHA * elapsed_ms + (1 - EWMA_ALPHA) * load.ewma_ms
+        )
+
+    def load(self, agent_name: str) -> Optional[AgentLoad]:
+        return self._load.get(agent_name)
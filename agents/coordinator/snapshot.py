@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Registry Snapshot - pre-encoded, ETag-tagged coordinator read endpoints
+Registry views are serialized once per change and served as bytes with conditional GET support
+"""
+
+import json
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.responses import Response
+
+logger = logging.getLogger("coordinator.snapshot")
+
+# Clients may cache but have to revalidate (cheap with If-None-Match)
+CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A JSON document encoded once, with its entity tag"""
+    body: bytes
+    etag: str
+
+    @classmethod
+    def encode(cls, document: Any) -> "EncodedBody":
+        body = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"')
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True when an If-None-Match header already names this representation"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+    def response(self, if_none_match: Optional[str] = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class RegistrySnapshot:
+    """
+    Versioned, lazily encoded views of the agent and skill registries.
+
+    Mutations only bump a version; the first read after a change rebuilds and
+    encodes the view, every later read until the next change returns the same
+    bytes and ETag. Skill views change only with registrations, so agent
+    liveness refreshes (`touch`) invalidate the agents view alone.
+    """
+
+    def __init__(self, build_skills: Callable[[str], Dict[str, Any]],
+                 build_agents: Callable[[str], Dict[str, Any]]) -> None:
+        self._build_skills = build_skills
+        self._build_agents = build_agents
+        self.version = 0
+        self.updated_at = datetime.utcnow().isoformat()
+        self._skills_version = 0
+        self._agents_version = 0
+        self._skills_built = -1
+        self._agents_built = -1
+        self._skills: Optional[EncodedBody] = None
+        self._agents: Optional[EncodedBody] = None
+
+    def invalidate(self) -> None:
+        """The registry changed: both views are stale"""
+        self.version += 1
+        self.updated_at = datetime.utcnow().isoformat()
+        self._skills_version = self.version
+        self._agents_version = self.version
+
+    def touch(self) -> None:
+        """Agent liveness changed: only the agents view is stale"""
+        self.version += 1
+        self._agents_version = self.version
+
+    def skills(self) -> EncodedBody:
+        if self._skills_built != self._skills_version:
+            self._skills = EncodedBody.encode(self._build_skills(self.updated_at))
+            self._skills_built = self._skills_version
+        return self._skills
+
+    def agents(self) -> EncodedBody:
+        if self._agents_built != self._agents_version:
+            self._agents = EncodedBody.encode(self._build_agents(datetime.utcnow().isoformat()))
+            self._agents_built = self._agents_version
+        return self._agents
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Streaming - Server-Sent Events framing for streamed coordinator replies
+Turns an agent's (possibly streamed) response into A2A task and artifact update events
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("coordinator.streaming")
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Keep proxies (Caddy, nginx) from buffering the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Agents that can stream answer with SSE or NDJSON; the rest send their usual JSON reply
+STREAM_ACCEPT = "text/event-stream, application/x-ndjson;q=0.9, application/json;q=0.8"
+
+
+def _encode(document: Any) -> str:
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":"))
+
+
+def _part(data: str) -> Dict[str, Any]:
+    """A2A message part for one piece of agent output: structured when it is JSON, text otherwise"""
+    try:
+        return {"kind": "data", "data": json.loads(data)}
+    except ValueError:
+        return {"kind": "text", "text": data}
+
+
+class TaskEventStream:
+    """SSE frames for one streamed message, as JSON-RPC 2.0 results in the A2A event shapes"""
+
+    def __init__(self, message_id: str, context_id: str) -> None:
+        self.message_id = message_id
+        self.context_id = context_id
+        self._event_id = 0
+        self._artifacts = 0
+
+    def _frame(self, event: str, result: Dict[str, Any]) -> str:
+        self._event_id += 1
+        data = _encode({"jsonrpc": "2.0", "id": self.message_id, "result": result})
+        return f"event: {event}\nid: {self._event_id}\ndata: {data}\n\n"
+
+    def status(self, state: str, message: str, final: bool = False,
+               extra: Optional[Dict[str, Any]] = None) -> str:
+        result = {
+            "kind": "taskStatusUpdate",
+            "contextId": self.context_id,
+            "state": state,
+            "message": message,
+            "final": final,
+        }
+        if extra:
+            result.update(extra)
+        return self._frame("task-update", result)
+
+    def artifact(self, part: Dict[str, Any]) -> str:
+        self._artifacts += 1
+        return self._frame("artifact-update", {
+            "kind": "taskArtifactUpdate",
+            "contextId": self.context_id,
+            "artifact": {"parts": [part]},
+            "index": self._artifacts - 1,
+            "append": self._artifacts > 1,
+        })
+
+
+async def iter_agent_parts(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield the agent's output as message parts while the body arrives.
+
+    SSE events and NDJSON lines become one part each, plain text is relayed
+    chunk by chunk, and a regular JSON body (which cannot be used before it is
+    complete) becomes a single part.
+    """
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type == SSE_MEDIA_TYPE:
+        data_lines = []
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                data_lines.append(line[5:].removeprefix(" "))
+            elif not line and data_lines:
+                yield _part("\n".join(data_lines))
+                data_lines = []
+        if data_lines:
+            yield _part("\n".join(data_lines))
+
+    elif content_type in ("application/x-ndjson", "application/jsonl"):
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield _part(line)
+
+    elif content_type.startswith("text/"):
+        async for chunk in response.aiter_text():
+            if chunk:
+                yield {"kind": "text", "text": chunk}
+
+    else:
+        body = await response.aread()
+        if body:
+            yield _part(body.decode(response.encoding or "utf-8", errors="replace"))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Liveness Monitor tests - TTL expiry and recovery of agents whose container keeps running
+Run with: python -m pytest agents/coordinator
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from watcher import LivenessMonitor
+
+
+def test_health_blip_longer_than_ttl_recovers():
+    registry = {"gmail": {"url": "http://gmail:8080", "last_seen": datetime.utcnow(), "healthy": True}}
+    answering = {"gmail": True}
+    expired, recovered = [], []
+
+    async def probe(name, url):
+        return answering[name]
+
+    monitor = LivenessMonitor(registry, probe, expired.append, ttl=30, on_recovered=recovered.append)
+
+    # The agent stops answering for longer than its TTL
+    answering["gmail"] = False
+    registry["gmail"]["last_seen"] -= timedelta(seconds=31)
+    asyncio.run(monitor.check())
+    assert expired == ["gmail"]
+    assert registry["gmail"]["healthy"] is False
+
+    # It stays in the registry and is not expired again on every round
+    asyncio.run(monitor.check())
+    assert expired == ["gmail"]
+    assert recovered == []
+
+    # The next successful probe brings it back
+    answering["gmail"] = True
+    asyncio.run(monitor.check())
+    assert recovered == ["gmail"]
+    assert registry["gmail"]["healthy"] is True
+    assert datetime.utcnow() - registry["gmail"]["last_seen"] < timedelta(seconds=5)
+
+
+def test_probe_error_within_ttl_keeps_agent_healthy():
+    registry = {"gcal": {"url": "http://gcal:8080", "last_seen": datetime.utcnow(), "healthy": True}}
+    expired = []
+
+    async def probe(name, url):
+        raise OSError("connection reset")
+
+    monitor = LivenessMonitor(registry, probe, expired.append, ttl=30)
+    asyncio.run(monitor.check())
+    assert expired == []
+    assert registry["gcal"]["healthy"] is True
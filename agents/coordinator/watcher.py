@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Agent Watcher - event-driven registry maintenance for the coordinator
+Follows Docker container start/die events and expires agents that stop answering health probes
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("coordinator.watcher")
+
+# Containers carrying this label are agents
+AGENT_LABEL = "agent=true"
+# Health probe path, interval, per-probe timeout, and how long an agent may go unanswered
+AGENT_HEALTH_PATH = os.getenv("AGENT_HEALTH_PATH", "/health")
+HEALTH_INTERVAL = float(os.getenv("AGENT_HEALTH_INTERVAL", "10"))
+HEALTH_TIMEOUT = float(os.getenv("AGENT_HEALTH_TIMEOUT", "2"))
+AGENT_TTL = float(os.getenv("AGENT_TTL", "30"))
+# Probed instead of the health path for agents that do not serve one
+AGENT_CARD_PATH = "/.well-known/agent.json"
+# Backoff between reconnects of the Docker events stream
+RECONNECT_BACKOFF = (0.5, 10.0)
+
+
+class DockerEventWatcher:
+    """
+    Follows the Docker events stream for agent containers on a daemon thread.
+
+    The Docker SDK's event stream is a blocking iterator, so it runs on its own
+    thread and hands every container `start`/`die` event to the event loop with
+    `run_coroutine_threadsafe`. If the stream breaks it reconnects with
+    `since=` set to the last event seen, so events in the gap are replayed
+    instead of rescanning all containers.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        on_start: Callable[[str], Awaitable[None]],
+        on_die: Callable[[str], Awaitable[None]],
+    ) -> None:
+        self.client_factory = client_factory
+        self.on_start = on_start
+        self.on_die = on_die
+        self.events_seen = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stream = None
+        self._stopping = threading.Event()
+        self._since: Optional[float] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop, since: Optional[float] = None) -> None:
+        """Start following events; `since` (epoch seconds) replays events from before the call"""
+        if self._thread is not None:
+            return
+        self._loop = loop
+        self._since = since
+        self._thread = threading.Thread(target=self._run, name="docker-events", daemon=True)
+        self._thread.start()
+        logger.info("👀 Watching Docker events for agent containers")
+
+    def stop(self) -> None:
+        self._stopping.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                # Closing the response unblocks the reader thread
+                stream.close()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        backoff = RECONNECT_BACKOFF[0]
+        while not self._stopping.is_set():
+            client = self.client_factory()
+            if client is None:
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF[1])
+                continue
+            try:
+                kwargs = {"since": int(self._since)} if self._since else {}
+                self._stream = client.events(
+                    decode=True,
+                    filters={"type": "container", "event": ["start", "die"], "label": AGENT_LABEL},
+                    **kwargs,
+                )
+                backoff = RECONNECT_BACKOFF[0]
+                for event in self._stream:
+                    self._dispatch(event)
+            except Exception as e:
+                if not self._stopping.is_set():
+                    logger.warning(f"⚠️ Docker events stream interrupted: {e!r}")
+            finally:
+                self._stream = None
+                try:
+                    client.close()
+                except Exception:
+                    pass
+            if not self._stopping.is_set():
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF[1])
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        action = event.get("Action") or event.get("status")
+        container_id = (event.get("Actor") or {}).get("ID") or event.get("id")
+        if not container_id or action not in ("start", "die"):
+            return
+        self.events_seen += 1
+        # Resume from this second after a reconnect (Docker's `since` has one-second resolution)
+        self._since = event.get("time", time.time())
+        handler = self.on_start if action == "start" else self.on_die
+        future = asyncio.run_coroutine_threadsafe(handler(container_id), self._loop)
+        future.add_done_callback(_log_handler_error)
+
+
+def _log_handler_error(future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"❌ Container event handler failed: {future.exception()!r}")
+
+
+class LivenessMonitor:
+    """
+    Periodic health probes for registered agents with TTL expiry.
+
+    Every `interval` seconds each agent's health endpoint is probed
+    concurrently; a successful probe refreshes its `last_seen`. Agents whose
+    `last_seen` is older than `ttl` are marked unhealthy and handed to
+    `on_expired`, which catches agents that hang without a `die` event. They
+    stay in the registry and keep being probed, so an agent that answers
+    again (its container is still running, Docker sends no new `start`) is
+    marked healthy and handed to `on_recovered`. `on_refreshed` is called
+    once per round in which any `last_seen` was updated.
+    """
+
+    def __init__(
+        self,
+        registry: Dict[str, Dict[str, Any]],
+        probe: Callable[[str, str], Awaitable[bool]],
+        on_expired: Callable[[str], None],
+        interval: float = HEALTH_INTERVAL,
+        ttl: float = AGENT_TTL,
+        on_refreshed: Optional[Callable[[], None]] = None,
+        on_recovered: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.registry = registry
+        self.probe = probe
+        self.on_expired = on_expired
+        self.on_refreshed = on_refreshed
+        self.on_recovered = on_recovered
+        self.interval = interval
+        self.ttl = ttl
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="agent-liveness")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"❌ Liveness check failed: {e!r}")
+
+    async def check(self) -> None:
+        agents = [(name, info["url"]) for name, info in self.registry.items()]
+        results = await asyncio.gather(*(self.probe(name, url) for name, url in agents), return_exceptions=True)
+
+        now = datetime.utcnow()
+        expiry = now - timedelta(seconds=self.ttl)
+        refreshed = False
+        for (name, _), alive in zip(agents, results):
+            info = self.registry.get(name)
+            if info is None:
+                continue
+            if alive is True:
+                info["last_seen"] = now
+                refreshed = True
+                if not info.get("healthy", True):
+                    info["healthy"] = True
+                    logger.info(f"💚 Agent {name} is answering again")
+                    if self.on_recovered is not None:
+                        self.on_recovered(name)
+            elif info["last_seen"] < expiry and info.get("healthy", True):
+                logger.warning(f"💤 Agent {name} not seen for {self.ttl:.0f}s, marking it unhealthy")
+                info["healthy"] = False
+                self.on_expired(name)
+        if refreshed and self.on_refreshed is not None:
+            self.on_refreshed()
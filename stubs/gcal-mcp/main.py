@@ -7,13 +7,23 @@ Provides stubbed Google Calendar API responses for Phase 0 testing
 import os
 import json
 import random
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
+from scheduling import (
+    PRIMARY, CalendarStore, format_epoch, generate_events, local_date, parse_datetime, working_windows
+)
+
+# Zone for working hours and for times given without an offset
+DEFAULT_TIME_ZONE = os.getenv("GCAL_TIME_ZONE", "Europe/Paris")
+# Synthetic events generated at startup on top of the samples (for load tests)
+SYNTHETIC_EVENTS = int(os.getenv("GCAL_SYNTHETIC_EVENTS", "0"))
+SYNTHETIC_SEED = int(os.getenv("GCAL_SYNTHETIC_SEED", "42"))
+
 app = FastAPI(
     title="Google Calendar MCP Stub Server",
     description="Stubbed Google Calendar API responses for Alfred Phase 0",
@@ -126,10 +136,20 @@ MEETING_TEMPLATES = {
     }
 }
 
+calendar = CalendarStore(DEFAULT_TIME_ZONE)
+calendar.extend(SAMPLE_EVENTS)
+if SYNTHETIC_EVENTS > 0:
+    calendar.extend(generate_events(SYNTHETIC_EVENTS, seed=SYNTHETIC_SEED, time_zone=DEFAULT_TIME_ZONE))
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "Google Calendar MCP Stub", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "service": "Google Calendar MCP Stub",
+        "events": len(calendar),
+        "timestamp": datetime.now().isoformat()
+    }
 
 @app.post("/invoke", response_model=MCPResponse)
 async def invoke_mcp(request: MCPRequest):
@@ -185,15 +205,9 @@ async def list_events(params: Dict[str, Any]) -> Dict[str, Any]:
     time_max = params.get("time_max", (datetime.now() + timedelta(days=7)).isoformat())
     max_results = params.get("max_results", 10)
 
-    # Filter events by time range
-    events = []
-    for event in SAMPLE_EVENTS:
-        event_start = event["start"]["dateTime"]
-        if time_min <= event_start <= time_max:
-            events.append(event)
-
-    # Sort by start time
-    events.sort(key=lambda x: x["start"]["dateTime"])
+    # Events starting in the range, already in start order
+    starts = calendar.starting(parse_datetime(time_min, DEFAULT_TIME_ZONE), parse_datetime(time_max, DEFAULT_TIME_ZONE))
+    events = [event.raw for event in starts]
 
     return {
         "events": events[:max_results],
@@ -294,53 +308,84 @@ async def delete_event(params: Dict[str, Any]) -> Dict[str, Any]:
         "message": f"Event {event_id} deleted successfully"
     }
 
+def resolve_range(params: Dict[str, Any], time_zone: str) -> Tuple[int, int]:
+    """[time_min, time_max) in epoch seconds: explicit time_min/time_max, else the whole local `date` (default today)"""
+    if params.get("time_min") or params.get("time_max"):
+        time_min = parse_datetime(params.get("time_min") or datetime.now().isoformat(), time_zone)
+        if params.get("time_max"):
+            return time_min, parse_datetime(params["time_max"], time_zone)
+        return time_min, time_min + 7 * 86400
+
+    day = date.fromisoformat(params.get("date") or datetime.now().strftime("%Y-%m-%d"))
+    return parse_datetime(day.isoformat(), time_zone), parse_datetime((day + timedelta(days=1)).isoformat(), time_zone)
+
 async def find_free_time(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Find free time slots"""
+    """Find free time slots shared by the calendar owner and any attendees, within working hours"""
 
-    date = params.get("date", datetime.now().strftime("%Y-%m-%d"))
     duration = params.get("duration", 60)  # minutes
     working_hours = params.get("working_hours", {"start": "09:00", "end": "17:00"})
+    attendees = params.get("attendees", [])
+    time_zone = params.get("time_zone", DEFAULT_TIME_ZONE)
+    include_weekends = params.get("include_weekends", False)
+    max_results = params.get("max_results", 20)
+
+    time_min, time_max = resolve_range(params, time_zone)
+    windows = working_windows(time_min, time_max, time_zone, working_hours.get("start", "09:00"),
+                              working_hours.get("end", "17:00"), include_weekends)
+    free = calendar.free([PRIMARY] + list(attendees), windows, duration * 60)
 
-    # Generate some free slots (simplified)
     free_slots = [
         {
-            "start": f"{date}T10:00:00Z",
-            "end": f"{date}T11:00:00Z",
-            "duration": 60
-        },
-        {
-            "start": f"{date}T15:00:00Z",
-            "end": f"{date}T16:30:00Z",
-            "duration": 90
+            "start": format_epoch(start, time_zone),
+            "end": format_epoch(end, time_zone),
+            "duration": (end - start) // 60
         }
+        for start, end in free[:max_results]
     ]
 
     return {
         "free_slots": free_slots,
-        "date": date,
+        "total_slots": len(free),
+        "date": local_date(time_min, time_zone),
+        "time_range": {
+            "start": format_epoch(time_min, time_zone),
+            "end": format_epoch(time_max, time_zone)
+        },
         "requested_duration": duration,
-        "working_hours": working_hours
+        "working_hours": working_hours,
+        "attendees": attendees,
+        "time_zone": time_zone
     }
 
 async def get_busy_times(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Get busy time periods"""
+    """Get busy time periods for the owner's calendar or the given attendees"""
 
-    date = params.get("date", datetime.now().strftime("%Y-%m-%d"))
+    calendars = params.get("attendees") or [PRIMARY]
+    time_zone = params.get("time_zone", DEFAULT_TIME_ZONE)
 
-    # Extract busy times from sample events
-    busy_times = []
-    for event in SAMPLE_EVENTS:
-        event_date = event["start"]["dateTime"][:10]
-        if event_date == date:
-            busy_times.append({
-                "start": event["start"]["dateTime"],
-                "end": event["end"]["dateTime"],
-                "summary": event["summary"]
-            })
+    time_min, time_max = resolve_range(params, time_zone)
+    busy_times = [
+        {
+            "start": event.raw["start"].get("dateTime", event.raw["start"].get("date")),
+            "end": event.raw["end"].get("dateTime", event.raw["end"].get("date")),
+            "summary": event.raw.get("summary", "")
+        }
+        for event in calendar.busy_events(calendars, time_min, time_max)
+    ]
 
     return {
         "busy_times": busy_times,
-        "date": date,
+        # Merged per calendar, like the Calendar API freebusy query
+        "calendars": {
+            name: {
+                "busy": [
+                    {"start": format_epoch(start, time_zone), "end": format_epoch(end, time_zone)}
+                    for start, end in calendar.busy(name, time_min, time_max)
+                ]
+            }
+            for name in calendars
+        },
+        "date": local_date(time_min, time_zone),
         "total_busy_periods": len(busy_times)
     }
 
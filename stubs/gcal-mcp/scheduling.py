@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Scheduling Engine - interval index over calendar events for the Google Calendar MCP stub
+Per-calendar sorted start/end epochs; free/busy by merging intervals across attendees within working hours
+"""
+
+import heapq
+import random
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# The calendar owner's own calendar, which holds every event
+PRIMARY = "primary"
+
+Interval = Tuple[int, int]
+
+
+def zone(name: Optional[str]) -> tzinfo:
+    return ZoneInfo(name) if name and name != "UTC" else timezone.utc
+
+
+def parse_datetime(value: str, time_zone: Optional[str] = None) -> int:
+    """
+    RFC 3339 date-time -> epoch seconds. Times without an offset are read in
+    `time_zone` (UTC when not given), and bare dates mean their midnight.
+    """
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=zone(time_zone))
+    return int(parsed.timestamp())
+
+
+def format_epoch(epoch: int, time_zone: Optional[str] = None) -> str:
+    return datetime.fromtimestamp(epoch, zone(time_zone)).isoformat()
+
+
+def local_date(epoch: int, time_zone: Optional[str] = None) -> str:
+    return datetime.fromtimestamp(epoch, zone(time_zone)).date().isoformat()
+
+
+def _event_time(value: Dict[str, Any], default_zone: Optional[str]) -> int:
+    time_zone = value.get("timeZone") or default_zone
+    if "dateTime" in value:
+        return parse_datetime(value["dateTime"], time_zone)
+    # All-day events: {"date": "2025-01-06"}
+    return parse_datetime(value["date"], time_zone)
+
+
+class Event:
+    """One event with its times resolved to epoch seconds at insert"""
+    __slots__ = ("id", "raw", "start", "end", "calendars", "blocking")
+
+    def __init__(self, raw: Dict[str, Any], default_zone: Optional[str] = None) -> None:
+        self.id = raw["id"]
+        self.raw = raw
+        self.start = _event_time(raw["start"], default_zone)
+        self.end = _event_time(raw["end"], default_zone)
+        if self.end < self.start:
+            raise ValueError(f"Event {self.id} ends before it starts")
+        # Calendars the event takes time from: the owner's, and every attendee who has not declined
+        self.calendars = [PRIMARY] + [
+            attendee["email"].lower() for attendee in raw.get("attendees", [])
+            if attendee.get("email") and attendee.get("responseStatus") != "declined"
+        ]
+        self.blocking = raw.get("status") != "cancelled" and raw.get("transparency") != "transparent"
+
+
+class Timeline:
+    """
+    One calendar's events as parallel lists sorted by start: starts, ends
+    and event ids. `max_duration` bounds how long before a range an
+    overlapping event can start, so an overlap query is two bisects plus a
+    pass over the events starting in (range start - max_duration, range end).
+    """
+    __slots__ = ("starts", "ends", "ids", "max_duration")
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.ids: List[str] = []
+        self.max_duration = 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, event: Event) -> None:
+        i = bisect_right(self.starts, event.start)
+        self.starts.insert(i, event.start)
+        self.ends.insert(i, event.end)
+        self.ids.insert(i, event.id)
+        self.max_duration = max(self.max_duration, event.end - event.start)
+
+    def remove(self, event: Event) -> None:
+        i = bisect_left(self.starts, event.start)
+        while i < len(self.starts) and self.starts[i] == event.start:
+            if self.ids[i] == event.id:
+                del self.starts[i], self.ends[i], self.ids[i]
+                return
+            i += 1
+
+    def rebuild(self, events: Iterable[Event]) -> None:
+        """Bulk load: one sort instead of an insert per event"""
+        ordered = sorted(events, key=lambda event: event.start)
+        self.starts = [event.start for event in ordered]
+        self.ends = [event.end for event in ordered]
+        self.ids = [event.id for event in ordered]
+        self.max_duration = max((event.end - event.start for event in ordered), default=0)
+
+    def starting(self, time_min: int, time_max: int) -> List[str]:
+        """Ids of the events starting in [time_min, time_max], by start"""
+        return self.ids[bisect_left(self.starts, time_min):bisect_right(self.starts, time_max)]
+
+    def overlapping(self, time_min: int, time_max: int) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, id) of the events overlapping [time_min, time_max), by start"""
+        lo = bisect_left(self.starts, time_min - self.max_duration)
+        hi = bisect_left(self.starts, time_max)
+        starts, ends, ids = self.starts, self.ends, self.ids
+        for i in range(lo, hi):
+            if ends[i] > time_min:
+                yield starts[i], ends[i], ids[i]
+
+    def intervals(self, time_min: int, time_max: int) -> List[Interval]:
+        """Busy intervals overlapping [time_min, time_max), clipped at its start, by start"""
+        lo = bisect_left(self.starts, time_min - self.max_duration)
+        hi = bisect_left(self.starts, time_max)
+        return [(start if start > time_min else time_min, end)
+                for start, end in zip(self.starts[lo:hi], self.ends[lo:hi]) if end > time_min]
+
+
+def merge_intervals(streams: Iterable[Iterable[Interval]]) -> List[Interval]:
+    """Union of several start-ordered interval streams as sorted, disjoint intervals"""
+    merged: List[Interval] = []
+    for start, end in heapq.merge(*streams):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def working_windows(time_min: int, time_max: int, time_zone: Optional[str], day_start: str = "09:00",
+                    day_end: str = "17:00", weekends: bool = False) -> List[Interval]:
+    """
+    Working-hour windows (local `day_start`-`day_end` in `time_zone`) clipped
+    to [time_min, time_max). Local times are converted day by day, so DST
+    changes are respected.
+    """
+    tz = zone(time_zone)
+    opens = time.fromisoformat(day_start)
+    closes = time.fromisoformat(day_end)
+    day = datetime.fromtimestamp(time_min, tz).date()
+    last = datetime.fromtimestamp(time_max, tz).date()
+    windows = []
+    while day <= last:
+        if weekends or day.weekday() < 5:
+            start = int(datetime.combine(day, opens, tz).timestamp())
+            end = int(datetime.combine(day, closes, tz).timestamp())
+            start, end = max(start, time_min), min(end, time_max)
+            if start < end:
+                windows.append((start, end))
+        day += timedelta(days=1)
+    return windows
+
+
+def subtract(windows: List[Interval], busy: List[Interval], min_duration: int) -> List[Interval]:
+    """Parts of sorted `windows` not covered by sorted, disjoint `busy`, kept when at least `min_duration` long"""
+    free = []
+    i = 0
+    for start, end in windows:
+        # Busy intervals that ended before this window cannot matter for later ones either
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        cursor = start
+        j = i
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] - cursor >= min_duration:
+                free.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if end - cursor >= min_duration:
+            free.append((cursor, end))
+    return free
+
+
+class CalendarStore:
+    """
+    Events by id plus one Timeline per calendar: the owner's primary
+    calendar and each attendee's (the events they have not declined).
+
+    Free/busy for any set of attendees merges their timelines' intervals in
+    the requested range, so the cost follows the events in that range, not
+    the size of the calendars.
+    """
+
+    def __init__(self, time_zone: Optional[str] = None) -> None:
+        # Zone for event times that carry neither an offset nor their own timeZone
+        self.time_zone = time_zone
+        self._events: Dict[str, Event] = {}
+        self._timelines: Dict[str, Timeline] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _timeline(self, calendar: str) -> Timeline:
+        timeline = self._timelines.get(calendar)
+        if timeline is None:
+            timeline = self._timelines[calendar] = Timeline()
+        return timeline
+
+    def add(self, raw: Dict[str, Any]) -> Event:
+        """Insert an event, replacing any event with the same id"""
+        event = Event(raw, self.time_zone)
+        self.remove(event.id)
+        self._events[event.id] = event
+        if event.blocking:
+            for calendar in event.calendars:
+                self._timeline(calendar).add(event)
+        return event
+
+    def extend(self, raws: Iterable[Dict[str, Any]]) -> None:
+        """Bulk load: each touched timeline is re-sorted once"""
+        added: Dict[str, List[Event]] = {}
+        for raw in raws:
+            event = Event(raw, self.time_zone)
+            if event.id in self._events:
+                raise ValueError(f"Duplicate event id: {event.id}")
+            self._events[event.id] = event
+            if event.blocking:
+                for calendar in event.calendars:
+                    added.setdefault(calendar, []).append(event)
+        for calendar, events in added.items():
+            timeline = self._timeline(calendar)
+            timeline.rebuild([self._events[event_id] for event_id in timeline.ids] + events)
+
+    def remove(self, event_id: str) -> Optional[Event]:
+        event = self._events.pop(event_id, None)
+        if event is not None and event.blocking:
+            for calendar in event.calendars:
+                self._timelines[calendar].remove(event)
+        return event
+
+    def get(self, event_id: str) -> Optional[Event]:
+        return self._events.get(event_id)
+
+    def starting(self, time_min: int, time_max: int, calendar: str = PRIMARY) -> List[Event]:
+        """Events starting in [time_min, time_max] on a calendar, by start"""
+        timeline = self._timelines.get(calendar.lower())
+        if timeline is None:
+            return []
+        return [self._events[event_id] for event_id in timeline.starting(time_min, time_max)]
+
+    def busy_events(self, calendars: Iterable[str], time_min: int, time_max: int) -> List[Event]:
+        """Blocking events overlapping the range on any of `calendars`, by start"""
+        found: Dict[str, Tuple[int, str]] = {}
+        for calendar in calendars:
+            timeline = self._timelines.get(calendar.lower())
+            if timeline is not None:
+                for start, _, event_id in timeline.overlapping(time_min, time_max):
+                    found[event_id] = (start, event_id)
+        return [self._events[event_id] for _, event_id in sorted(found.values())]
+
+    def busy(self, calendar: str, time_min: int, time_max: int) -> List[Interval]:
+        """One calendar's busy time in the range as sorted, disjoint intervals"""
+        timeline = self._timelines.get(calendar.lower())
+        if timeline is None:
+            return []
+        return [(start, min(end, time_max)) for start, end in merge_intervals([timeline.intervals(time_min, time_max)])]
+
+    def free(self, calendars: Iterable[str], windows: List[Interval], min_duration: int) -> List[Interval]:
+        """Time inside sorted `windows` when every calendar is free, in gaps of at least `min_duration`"""
+        if not windows:
+            return []
+        time_min, time_max = windows[0][0], windows[-1][1]
+        streams = []
+        for calendar in calendars:
+            timeline = self._timelines.get(calendar.lower())
+            if timeline is not None:
+                streams.append(timeline.intervals(time_min, time_max))
+        return subtract(windows, merge_intervals(streams), min_duration)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"events": len(self._events), "calendars": len(self._timelines)}
+
+
+# Synthetic events for load tests
+_PEOPLE = [
+    "lucius.fox@wayne-enterprises.com", "alfred.pennyworth@wayne-manor.com", "commissioner.gordon@gcpd.gov",
+    "selina.kyle@gmail.com", "dick.grayson@wayne-enterprises.com", "barbara.gordon@gcpd.gov",
+    "leslie.thompkins@gotham-clinic.org", "harvey.dent@gotham-da.gov",
+]
+_SUMMARIES = ["Board prep", "1:1", "Applied Sciences review", "Foundation grants", "Budget sync",
+              "Gala planning", "Security briefing", "Lunch", "Interview", "Quarterly review"]
+
+
+def generate_events(count: int, seed: int = 42, start: str = "2025-01-06", days: int = 365,
+                    time_zone: str = "Europe/Paris") -> Iterator[Dict[str, Any]]:
+    """Deterministic synthetic events on weekdays between 08:00 and 19:00 local time"""
+    rng = random.Random(seed)
+    tz = zone(time_zone)
+    first = date.fromisoformat(start)
+    for n in range(count):
+        day = first + timedelta(days=rng.randrange(days))
+        if day.weekday() >= 5:
+            day -= timedelta(days=day.weekday() - 4)
+        begins = datetime.combine(day, time(rng.randint(8, 18), rng.choice((0, 15, 30, 45))), tz)
+        ends = begins + timedelta(minutes=rng.choice((15, 30, 30, 45, 60, 60, 90, 120)))
+        yield {
+            "id": f"event_s{n:07d}",
+            "summary": rng.choice(_SUMMARIES),
+            "description": "",
+            "start": {"dateTime": begins.isoformat(), "timeZone": time_zone},
+            "end": {"dateTime": ends.isoformat(), "timeZone": time_zone},
+            "attendees": [
+                {"email": email, "responseStatus": rng.choice(("accepted", "accepted", "tentative", "declined"))}
+                for email in rng.sample(_PEOPLE, rng.randint(0, 3))
+            ],
+            "location": "",
+            "status": "confirmed",
+            "created": begins.isoformat(),
+        }
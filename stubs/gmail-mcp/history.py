@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+History Log - append-only change log behind the Gmail stub's history ids
+Answers "what changed since history id N" so clients can refresh by delta instead of re-listing
+"""
+
+import os
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+# Entry kinds
+ADDED = 0
+RELABELLED = 1
+# One label taken off a message (recorded next to its RELABELLED entry)
+LABEL_REMOVED = 2
+
+# Log entries below which compaction is never attempted
+HISTORY_COMPACT_MIN = int(os.getenv("GMAIL_HISTORY_COMPACT_MIN", "100000"))
+
+
+class HistoryLog:
+    """
+    (history id, kind, docno, label) entries in history id order, stored in
+    flat arrays (15 bytes an entry). Labels are interned to small codes; 0
+    means the entry has no label.
+
+    Compaction keeps only the newest entry of each kind (and label) per
+    message. That loses nothing `since` or `label_removals` can observe: a
+    message changed after N still has an entry after N, and one added after
+    N keeps its ADDED entry. It runs when the log has doubled since the last
+    compaction, so appends stay amortised O(1) and the log stays within twice
+    the number of distinct (message, kind, label) changes.
+    """
+
+    def __init__(self, compact_min: int = HISTORY_COMPACT_MIN) -> None:
+        self.compact_min = compact_min
+        self._ids = array("Q")
+        self._kinds = array("B")
+        self._docnos = array("I")
+        self._labels = array("H")
+        self._label_codes: Dict[str, int] = {}
+        self._compacted_size = 0
+        self.compactions = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def record(self, history_id: int, kind: int, docnos: List[int], label: Optional[str] = None) -> None:
+        if not docnos:
+            return
+        code = 0
+        if label is not None:
+            code = self._label_codes.setdefault(label, len(self._label_codes) + 1)
+        self._ids.extend([history_id] * len(docnos))
+        self._kinds.extend([kind] * len(docnos))
+        self._docnos.extend(docnos)
+        self._labels.extend([code] * len(docnos))
+        if len(self._ids) > max(self.compact_min, 2 * self._compacted_size):
+            self.compact()
+
+    def compact(self) -> None:
+        newest: Dict[Tuple[int, int, int], int] = {}
+        for history_id, kind, docno, code in zip(self._ids, self._kinds, self._docnos, self._labels):
+            newest[(docno, kind, code)] = history_id
+        entries = sorted((history_id, kind, docno, code) for (docno, kind, code), history_id in newest.items())
+        self._ids = array("Q", (entry[0] for entry in entries))
+        self._kinds = array("B", (entry[1] for entry in entries))
+        self._docnos = array("I", (entry[2] for entry in entries))
+        self._labels = array("H", (entry[3] for entry in entries))
+        self._compacted_size = len(entries)
+        self.compactions += 1
+
+    def since(self, history_id: int) -> Tuple[List[int], List[int]]:
+        """
+        Docnos of the messages added after `history_id`, and of the older
+        messages relabelled after it, each in the order of their changes.
+        Costs O(entries after `history_id`).
+        """
+        start = bisect_right(self._ids, history_id)
+        added: Dict[int, None] = {}
+        relabelled: Dict[int, None] = {}
+        for i in range(start, len(self._ids)):
+            docno = self._docnos[i]
+            kind = self._kinds[i]
+            if kind == ADDED:
+                added[docno] = None
+            elif kind == RELABELLED:
+                relabelled.pop(docno, None)
+                relabelled[docno] = None
+        return list(added), [docno for docno in relabelled if docno not in added]
+
+    def label_removals(self, history_id: int, label: str) -> List[int]:
+        """Docnos of the messages `label` was taken off after `history_id`"""
+        code = self._label_codes.get(label)
+        if code is None:
+            return []
+        start = bisect_right(self._ids, history_id)
+        return list(dict.fromkeys(
+            self._docnos[i] for i in range(start, len(self._ids))
+            if self._kinds[i] == LABEL_REMOVED and self._labels[i] == code
+        ))
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._ids), "compactions": self.compactions}
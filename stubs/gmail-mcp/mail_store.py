@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Mailbox Store - indexed in-memory message store for the Gmail MCP stub
+Label postings, an unread posting and a date-ordered index so filters and paging never scan the mailbox
+"""
+
+import heapq
+import random
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from history import ADDED, LABEL_REMOVED, RELABELLED, HistoryLog
+
+# Reserved label for unread messages, as in the Gmail API; kept out of a message's public "labels"
+UNREAD = "UNREAD"
+SNIPPET_LENGTH = 80
+# Keys added to a posting at once above which it is re-sorted instead of insorted key by key
+BULK_THRESHOLD = 64
+
+# (date epoch seconds, docno): unique per message and ordered by date
+Key = Tuple[int, int]
+
+
+def parse_date(value: str) -> int:
+    """RFC 3339 timestamp ("2025-01-05T14:30:00Z") -> epoch seconds"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def encode_cursor(key: Key) -> str:
+    return f"{key[0]}.{key[1]}"
+
+
+def decode_cursor(token: str) -> Key:
+    try:
+        epoch, docno = token.split(".")
+        return int(epoch), int(docno)
+    except ValueError:
+        raise ValueError(f"Invalid page token: {token!r}") from None
+
+
+class Message:
+    """One stored message, with its search fields lowercased once at insert"""
+    __slots__ = ("docno", "id", "thread_id", "sender", "to", "subject", "snippet", "date", "epoch",
+                 "labels", "unread", "body", "sender_lc", "subject_lc", "body_lc")
+
+    def __init__(self, docno: int, raw: Dict[str, Any]) -> None:
+        self.docno = docno
+        self.id = raw["id"]
+        self.thread_id = raw.get("threadId", raw["id"])
+        self.sender = raw.get("from", "")
+        self.to = raw.get("to", "")
+        self.subject = raw.get("subject", "")
+        self.body = raw.get("body", "")
+        self.snippet = raw.get("snippet") or self.body[:SNIPPET_LENGTH]
+        self.date = raw["date"]
+        self.epoch = parse_date(self.date)
+        self.labels = [label for label in raw.get("labels", []) if label != UNREAD]
+        self.unread = bool(raw.get("unread", UNREAD in raw.get("labels", ())))
+        self.sender_lc = self.sender.lower()
+        self.subject_lc = self.subject.lower()
+        self.body_lc = self.body.lower()
+
+    @property
+    def key(self) -> Key:
+        return self.epoch, self.docno
+
+    def label_ids(self) -> List[str]:
+        """Labels including the reserved UNREAD label, i.e. every posting this message is in"""
+        return self.labels + [UNREAD] if self.unread else list(self.labels)
+
+    def relabel(self, added: Iterable[str], removed: Iterable[str]) -> None:
+        for label in removed:
+            if label == UNREAD:
+                self.unread = False
+            else:
+                self.labels.remove(label)
+        for label in added:
+            if label == UNREAD:
+                self.unread = True
+            else:
+                self.labels.append(label)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "threadId": self.thread_id,
+            "from": self.sender,
+            "to": self.to,
+            "subject": self.subject,
+            "snippet": self.snippet,
+            "date": self.date,
+            "labels": list(self.labels),
+            "unread": self.unread,
+            "body": self.body,
+        }
+
+    def summary(self) -> Dict[str, str]:
+        return {"id": self.id, "subject": self.subject, "from": self.sender}
+
+
+class Posting:
+    """
+    Keys of the messages in one index, sorted oldest first, plus their live
+    docnos for O(1) membership.
+
+    Removing a message only drops its docno: the key stays in `keys` as a
+    tombstone, skipped when reading and revived if the message comes back,
+    until tombstones make up half the list and it is compacted. Relabelling
+    m messages therefore costs O(m) amortised, not a list deletion each.
+    """
+    __slots__ = ("keys", "docnos", "stale")
+
+    def __init__(self) -> None:
+        self.keys: List[Key] = []
+        self.docnos: Set[int] = set()
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self.docnos)
+
+    def __contains__(self, docno: int) -> bool:
+        return docno in self.docnos
+
+    def _listed(self, key: Key) -> bool:
+        """Whether a key not in `docnos` is still in `keys` as a tombstone (and revive it if so)"""
+        if not self.stale:
+            return False
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            self.stale -= 1
+            return True
+        return False
+
+    def add(self, key: Key) -> None:
+        if key[1] in self.docnos:
+            return
+        self.docnos.add(key[1])
+        if self._listed(key):
+            return
+        # New mail is usually the newest, which makes insort an append
+        if not self.keys or key > self.keys[-1]:
+            self.keys.append(key)
+        else:
+            insort(self.keys, key)
+
+    def add_many(self, keys: Iterable[Key]) -> None:
+        fresh = []
+        for key in keys:
+            if key[1] in self.docnos:
+                continue
+            self.docnos.add(key[1])
+            if not self._listed(key):
+                fresh.append(key)
+        if len(fresh) > BULK_THRESHOLD:
+            # Two sorted runs: one timsort pass merges them
+            fresh.sort()
+            self.keys.extend(fresh)
+            self.keys.sort()
+        else:
+            for key in fresh:
+                insort(self.keys, key)
+
+    def append_unsorted(self, key: Key) -> None:
+        """Bulk loading of new messages only: the caller sorts `keys` once it is done"""
+        self.docnos.add(key[1])
+        self.keys.append(key)
+
+    def discard(self, key: Key) -> None:
+        if key[1] not in self.docnos:
+            return
+        self.docnos.discard(key[1])
+        self.stale += 1
+        if self.stale * 2 > len(self.keys):
+            self.keys = [key for key in self.keys if key[1] in self.docnos]
+            self.stale = 0
+
+    def newest_first(self, before: Optional[Key] = None) -> Iterator[Key]:
+        """Keys from newest to oldest, starting just below `before` (a page cursor) when given"""
+        keys = self.keys
+        docnos = self.docnos
+        end = len(keys) if before is None else bisect_left(keys, before)
+        for i in range(end - 1, -1, -1):
+            if keys[i][1] in docnos:
+                yield keys[i]
+
+
+def merge_newest_first(iterators: List[Iterator[Key]]) -> Iterator[Key]:
+    """Union of several newest-first key streams, still newest first and without duplicates"""
+    last = None
+    for key in heapq.merge(*iterators, reverse=True):
+        if key != last:
+            yield key
+            last = key
+
+
+class Mailbox:
+    """
+    Messages by id and docno, plus one Posting per label, one for UNREAD and
+    one for the whole mailbox.
+
+    Every posting is ordered by date, so a page of a label (or of the union of
+    a few labels) is a bisect to the cursor followed by reading `limit` keys:
+    the cost depends on the page, not on the size of the mailbox.
+    """
+
+    def __init__(self) -> None:
+        self._messages: Dict[int, Message] = {}
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, Posting] = {}
+        self._all = Posting()
+        self._next_docno = 0
+        # Bumped by every mutation (Gmail's historyId); the log maps ids back to the changed messages
+        self.history_id = 1
+        self.history = HistoryLog()
+        self._listeners: List[Callable[[List[Message]], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self._ids
+
+    def subscribe(self, listener: Callable[[List[Message]], None]) -> None:
+        """Call `listener` with every batch of newly stored messages (e.g. to keep a search index current)"""
+        self._listeners.append(listener)
+
+    def _notify(self, messages: List[Message]) -> None:
+        for listener in self._listeners:
+            listener(messages)
+
+    @property
+    def timeline(self) -> Posting:
+        """The posting of every message"""
+        return self._all
+
+    def posting(self, label: str) -> Posting:
+        """A label's posting (an empty one for labels no message carries)"""
+        return self._postings.get(label) or Posting()
+
+    def _posting(self, label: str) -> Posting:
+        posting = self._postings.get(label)
+        if posting is None:
+            posting = self._postings[label] = Posting()
+        return posting
+
+    def _store(self, raw: Dict[str, Any]) -> Message:
+        if raw["id"] in self._ids:
+            raise ValueError(f"Duplicate message id: {raw['id']}")
+        message = Message(self._next_docno, raw)
+        self._next_docno += 1
+        self._messages[message.docno] = message
+        self._ids[message.id] = message.docno
+        return message
+
+    def add(self, raw: Dict[str, Any]) -> Message:
+        message = self._store(raw)
+        key = message.key
+        self._all.add(key)
+        for label in message.label_ids():
+            self._posting(label).add(key)
+        self.history_id += 1
+        self.history.record(self.history_id, ADDED, [message.docno])
+        self._notify([message])
+        return message
+
+    def extend(self, raws: Iterable[Dict[str, Any]]) -> List[Message]:
+        """Bulk load: append to every posting, then sort each touched posting once"""
+        added = [self._store(raw) for raw in raws]
+        touched = {id(self._all): self._all}
+        for message in added:
+            key = message.key
+            self._all.append_unsorted(key)
+            for label in message.label_ids():
+                posting = self._posting(label)
+                posting.append_unsorted(key)
+                touched[id(posting)] = posting
+        for posting in touched.values():
+            posting.keys.sort()
+        if added:
+            self.history_id += 1
+            self.history.record(self.history_id, ADDED, [message.docno for message in added])
+        self._notify(added)
+        return added
+
+    def modify(self, messages: Iterable[Message], add_labels: Iterable[str] = (),
+               remove_labels: Iterable[str] = ()) -> Tuple[List[Message], int]:
+        """
+        Apply one label change to many messages, like Gmail's batchModify.
+
+        Each touched posting gets all of its keys in one call, so the cost
+        follows the number of changed messages rather than the mailbox size.
+        Returns the messages that actually changed and the resulting history id.
+        """
+        add_labels = [label for label in dict.fromkeys(add_labels) if label]
+        remove_labels = [label for label in dict.fromkeys(remove_labels) if label and label not in add_labels]
+        additions: Dict[str, List[Key]] = {label: [] for label in add_labels}
+        removals: Dict[str, List[Key]] = {label: [] for label in remove_labels}
+
+        changed = []
+        for message in messages:
+            current = message.label_ids()
+            added = [label for label in add_labels if label not in current]
+            removed = [label for label in remove_labels if label in current]
+            if not added and not removed:
+                continue
+            key = message.key
+            for label in added:
+                additions[label].append(key)
+            for label in removed:
+                removals[label].append(key)
+            message.relabel(added, removed)
+            changed.append(message)
+
+        for label, keys in additions.items():
+            if keys:
+                self._posting(label).add_many(keys)
+        for label, keys in removals.items():
+            posting = self._postings.get(label)
+            for key in keys:
+                posting.discard(key)
+        if changed:
+            self.history_id += 1
+            self.history.record(self.history_id, RELABELLED, [message.docno for message in changed])
+            for label, keys in removals.items():
+                self.history.record(self.history_id, LABEL_REMOVED, [key[1] for key in keys], label=label)
+        return changed, self.history_id
+
+    def get(self, message_id: str) -> Optional[Message]:
+        docno = self._ids.get(message_id)
+        return None if docno is None else self._messages[docno]
+
+    def by_docno(self, docno: int) -> Message:
+        return self._messages[docno]
+
+    def by_key(self, key: Key) -> Message:
+        return self._messages[key[1]]
+
+    def messages(self) -> Iterator[Message]:
+        """Every message, newest first"""
+        for key in self._all.newest_first():
+            yield self._messages[key[1]]
+
+    def count(self, label: str) -> int:
+        posting = self._postings.get(label)
+        return len(posting) if posting is not None else 0
+
+    @property
+    def unread_count(self) -> int:
+        return self.count(UNREAD)
+
+    def label_counts(self) -> Dict[str, int]:
+        return {label: len(posting) for label, posting in sorted(self._postings.items()) if posting}
+
+    def keys(self, labels: Optional[Iterable[str]] = None, unread_only: bool = False,
+             before: Optional[Key] = None) -> Iterator[Key]:
+        """
+        Newest-first keys of the messages carrying any of `labels` (every
+        message when no labels are given), optionally only unread ones,
+        starting below the cursor `before`.
+        """
+        labels = list(dict.fromkeys(labels or ()))
+        if not labels:
+            source = self._postings.get(UNREAD, Posting()) if unread_only else self._all
+            yield from source.newest_first(before)
+            return
+
+        postings = [self._postings[label] for label in labels if label in self._postings]
+        if len(postings) == 1:
+            stream = postings[0].newest_first(before)
+        else:
+            stream = merge_newest_first([posting.newest_first(before) for posting in postings])
+        for key in stream:
+            if not unread_only or self._messages[key[1]].unread:
+                yield key
+
+    def page(self, labels: Optional[Iterable[str]] = None, unread_only: bool = False,
+             limit: int = 10, page_token: Optional[str] = None) -> Tuple[List[Message], Optional[str]]:
+        """One page of messages, newest first, and the token of the next page (None on the last)"""
+        if limit <= 0:
+            return [], None
+        before = decode_cursor(page_token) if page_token else None
+        page: List[Message] = []
+        for key in self.keys(labels, unread_only, before):
+            if len(page) == limit:
+                return page, encode_cursor(page[-1].key)
+            page.append(self._messages[key[1]])
+        return page, None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "messages": len(self._messages),
+            "unread": self.unread_count,
+            "history_id": self.history_id,
+            "history": self.history.stats(),
+            "labels": self.label_counts(),
+        }
+
+
+# Synthetic mail for load tests: (sender, domain, labels, subject templates)
+_SENDERS = [
+    ("lucius.fox", "wayne-enterprises.com", ["INBOX", "IMPORTANT"],
+     ["Board meeting agenda for {day}", "Applied Sciences budget review", "Q{quarter} numbers before the board",
+      "Prototype armour test results", "Re: {topic} proposal"]),
+    ("alfred.pennyworth", "wayne-manor.com", ["INBOX", "IMPORTANT"],
+     ["Dinner at eight, sir", "The Batmobile is due for service", "Reminder: {topic} on {day}",
+      "Gardening schedule for the manor"]),
+    ("commissioner.gordon", "gcpd.gov", ["INBOX", "IMPORTANT"],
+     ["Rooftop at midnight", "Arkham transfer schedule", "Need your help with {topic}"]),
+    ("selina.kyle", "gmail.com", ["INBOX"],
+     ["Gala on {day}?", "Returned your cufflinks", "About the diamond exhibition"]),
+    ("hr", "wayne-enterprises.com", ["INBOX", "CATEGORY_UPDATES"],
+     ["Updated travel policy", "Open enrolment closes {day}", "Quarterly all-hands recording"]),
+    ("newsletter", "gotham-gazette.com", ["INBOX", "CATEGORY_UPDATES"],
+     ["Gotham Gazette morning briefing", "Weekly digest: {topic}", "This week in Gotham business"]),
+    ("deals", "gotham-outfitters.com", ["INBOX", "CATEGORY_PROMOTIONS"],
+     ["{percent}% off everything this weekend", "Your exclusive member offer", "Last chance: winter sale ends {day}"]),
+    ("offers", "ace-chemicals.com", ["INBOX", "CATEGORY_PROMOTIONS"],
+     ["New catalogue for {quarter}Q", "Free shipping on bulk orders", "{percent}% off lab equipment"]),
+    ("notifications", "github.com", ["INBOX", "CATEGORY_UPDATES"],
+     ["[wayne-tech] New pull request: {topic}", "[wayne-tech] CI failed on main", "Security alert for {topic}"]),
+    ("friends", "social.gotham.net", ["INBOX", "CATEGORY_SOCIAL"],
+     ["{name} tagged you in a photo", "{name} invited you to an event", "You have new followers"]),
+]
+_TOPICS = ["the board", "the Batmobile", "Applied Sciences", "the charity gala", "Arkham security",
+           "the Wayne Foundation", "the merger", "the satellite launch", "the quarterly report", "Blackgate"]
+_NAMES = ["Dick", "Barbara", "Tim", "Harvey", "Vicki", "Leslie", "Lucius", "Jim"]
+_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+_BODIES = [
+    "Following up on {topic}. Can we find time {day} to go over the details?",
+    "Please see the attached notes on {topic}; let me know if anything needs changing before {day}.",
+    "Quick reminder about {topic}. Nothing urgent, but it would help to have an answer by {day}.",
+    "I have looked into {topic} and there are a few open questions for the board.",
+    "Use code GOTHAM{percent} at checkout. Offer valid until {day}.",
+]
+
+
+def generate_messages(count: int, seed: int = 42, end: str = "2025-01-05T00:00:00Z",
+                      span_days: int = 365) -> Iterator[Dict[str, Any]]:
+    """Deterministic synthetic messages spread over `span_days` before `end`, oldest first"""
+    rng = random.Random(seed)
+    end_epoch = parse_date(end)
+    span = span_days * 86400
+    offsets = sorted(rng.randrange(span) for _ in range(count))
+    thread = 0
+    for n, offset in enumerate(offsets):
+        user, domain, labels, subjects = rng.choice(_SENDERS)
+        values = {
+            "topic": rng.choice(_TOPICS),
+            "day": rng.choice(_DAYS),
+            "name": rng.choice(_NAMES),
+            "percent": rng.choice((10, 20, 25, 40, 50)),
+            "quarter": rng.randint(1, 4),
+        }
+        if rng.random() > 0.3:
+            thread += 1
+        body = rng.choice(_BODIES).format(**values)
+        yield {
+            "id": f"msg_s{n:07d}",
+            "threadId": f"thread_s{thread:07d}",
+            "from": f"{user}@{domain}",
+            "to": "bruce@wayne-enterprises.com",
+            "subject": rng.choice(subjects).format(**values),
+            "date": datetime.fromtimestamp(end_epoch - span + offset, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "labels": list(labels) + (["STARRED"] if rng.random() < 0.02 else []),
+            # Older mail has mostly been read
+            "unread": rng.random() < (0.05 + 0.45 * offset / span),
+            "body": body,
+        }
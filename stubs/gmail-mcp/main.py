@@ -8,12 +8,24 @@ import os
 import json
 import random
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
+from mail_store import UNREAD, Mailbox, Message, generate_messages
+from search import SearchIndex
+
+# Synthetic messages generated at startup on top of the samples (for load tests)
+SYNTHETIC_MESSAGES = int(os.getenv("GMAIL_SYNTHETIC_MESSAGES", "0"))
+SYNTHETIC_SEED = int(os.getenv("GMAIL_SYNTHETIC_SEED", "42"))
+# Archived messages listed in an archive response (archived_count covers all of them)
+ARCHIVE_LIST_LIMIT = 100
+DEFAULT_ARCHIVE_QUERY = "category:promotions OR category:updates"
+# Changed messages a history_list answer may carry; beyond that the client is told to do a full sync
+HISTORY_MAX_RESULTS = int(os.getenv("GMAIL_HISTORY_MAX_RESULTS", "1000"))
+
 app = FastAPI(
     title="Gmail MCP Stub Server",
     description="Stubbed Gmail API responses for Alfred Phase 0",
@@ -80,6 +92,12 @@ SAMPLE_EMAILS = [
     }
 ]
 
+mailbox = Mailbox()
+search_index = SearchIndex(mailbox)
+mailbox.extend(SAMPLE_EMAILS)
+if SYNTHETIC_MESSAGES > 0:
+    mailbox.extend(generate_messages(SYNTHETIC_MESSAGES, seed=SYNTHETIC_SEED))
+
 DRAFT_TEMPLATES = {
     "reply": "Thank you for your email. I'll get back to you shortly regarding {subject}.",
     "follow_up": "Following up on our previous conversation about {topic}.",
@@ -90,7 +108,13 @@ DRAFT_TEMPLATES = {
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "Gmail MCP Stub", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "service": "Gmail MCP Stub",
+        "messages": len(mailbox),
+        "history_id": mailbox.history_id,
+        "timestamp": datetime.now().isoformat()
+    }
 
 @app.post("/invoke", response_model=MCPResponse)
 async def invoke_mcp(request: MCPRequest):
@@ -118,6 +142,12 @@ async def invoke_mcp(request: MCPRequest):
         elif request.task == "mark_read":
             result = await mark_as_read(request.parameters)
 
+        elif request.task in ("batch_modify", "batchModify"):
+            result = await batch_modify(request.parameters)
+
+        elif request.task == "history_list":
+            result = await history_list(request.parameters)
+
         else:
             raise HTTPException(status_code=400, detail=f"Unknown task: {request.task}")
 
@@ -137,51 +167,59 @@ async def invoke_mcp(request: MCPRequest):
         )
 
 async def list_emails(params: Dict[str, Any]) -> Dict[str, Any]:
-    """List emails with optional filtering"""
+    """List emails, newest first, with optional label/unread filtering and paging"""
 
     max_results = params.get("max_results", 10)
     label_filter = params.get("labels", [])
     unread_only = params.get("unread_only", False)
+    page_token = params.get("page_token")
 
-    emails = SAMPLE_EMAILS.copy()
-
-    # Apply filters
-    if label_filter:
-        emails = [email for email in emails if any(label in email["labels"] for label in label_filter)]
-
-    if unread_only:
-        emails = [email for email in emails if email["unread"]]
-
-    # Limit results
-    emails = emails[:max_results]
+    # Served from the date-ordered label postings: cost follows the page size
+    page, next_page_token = mailbox.page(label_filter, unread_only, max_results, page_token)
+    emails = [message.to_dict() for message in page]
 
     return {
         "emails": emails,
         "total_count": len(emails),
         "unread_count": len([e for e in emails if e["unread"]]),
-        "has_more": False
+        "has_more": next_page_token is not None,
+        "next_page_token": next_page_token,
+        # Starting point for history_list deltas
+        "history_id": mailbox.history_id
     }
 
-async def archive_emails(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Archive emails (promotions and newsletters)"""
+def requested_ids(params: Dict[str, Any]) -> Optional[List[str]]:
+    """Message ids named by `email_ids` (or Gmail's `ids`), if any"""
+    return params.get("email_ids") or params.get("ids")
+
+def select_messages(params: Dict[str, Any], default_query: Optional[str] = None,
+                    within: Optional[str] = None) -> Tuple[List[Message], List[str]]:
+    """Messages named by `email_ids` (or Gmail's `ids`), else those matching `query`; plus unknown ids"""
+    email_ids = requested_ids(params)
+    if email_ids:
+        found = [mailbox.get(email_id) for email_id in email_ids]
+        missing = [email_id for email_id, message in zip(email_ids, found) if message is None]
+        return [message for message in found if message is not None], missing
 
-    query = params.get("query", "category:promotions OR category:updates")
+    query = params.get("query") or default_query
+    if not query:
+        raise ValueError("Either email_ids or query is required")
+    return search_index.select(query, within=within), []
 
-    # Simulate archiving promotional emails
-    archived_emails = []
-    for email in SAMPLE_EMAILS:
-        if ("CATEGORY_PROMOTIONS" in email["labels"] or
-            "CATEGORY_UPDATES" in email["labels"]):
-            archived_emails.append({
-                "id": email["id"],
-                "subject": email["subject"],
-                "from": email["from"]
-            })
+async def archive_emails(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Archive emails (promotions and newsletters by default): remove INBOX from every match in one batch"""
+
+    # Explicit ids take precedence over any query, so none was used
+    query = None if requested_ids(params) else params.get("query") or DEFAULT_ARCHIVE_QUERY
+    messages, missing = select_messages(params, DEFAULT_ARCHIVE_QUERY, within="INBOX")
+    archived, history_id = mailbox.modify(messages, remove_labels=["INBOX"])
 
     return {
-        "archived_count": len(archived_emails),
-        "archived_emails": archived_emails,
-        "query_used": query
+        "archived_count": len(archived),
+        "archived_emails": [message.summary() for message in archived[:ARCHIVE_LIST_LIMIT]],
+        "query_used": query,
+        "not_found": missing,
+        "history_id": history_id
     }
 
 async def create_draft(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -232,34 +270,103 @@ async def send_email(params: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 async def search_emails(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Search emails by query"""
+    """Search emails with Gmail query syntax: free text ranked by BM25, operators as filters"""
 
     query = params.get("query", "")
     max_results = params.get("max_results", 10)
+    page_token = params.get("page_token")
 
-    # Simple search simulation
-    results = []
-    for email in SAMPLE_EMAILS:
-        if (query.lower() in email["subject"].lower() or
-            query.lower() in email["body"].lower() or
-            query.lower() in email["from"].lower()):
-            results.append(email)
+    page = search_index.search(query, max_results, page_token)
+    results = [message.to_dict() for message in page.messages]
+    if page.scores is not None:
+        for result, score in zip(results, page.scores):
+            result["score"] = round(score, 4)
 
     return {
-        "results": results[:max_results],
+        "results": results,
         "query": query,
-        "total_found": len(results)
+        "total_found": page.total,
+        "total_estimated": page.estimated,
+        "has_more": page.next_page_token is not None,
+        "next_page_token": page.next_page_token
     }
 
 async def mark_as_read(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Mark emails as read"""
+    """Mark emails (by id or query) as read"""
+
+    messages, missing = select_messages(params)
+    changed, history_id = mailbox.modify(messages, remove_labels=[UNREAD])
+
+    return {
+        "marked_read": [message.id for message in messages],
+        "count": len(messages),
+        "changed_count": len(changed),
+        "not_found": missing,
+        "status": "completed",
+        "history_id": history_id
+    }
+
+async def batch_modify(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Add and remove labels on many emails (by id or query) in one call, like Gmail's batchModify"""
+
+    add_labels = params.get("add_labels") or params.get("addLabelIds") or []
+    remove_labels = params.get("remove_labels") or params.get("removeLabelIds") or []
+    if not add_labels and not remove_labels:
+        raise ValueError("add_labels or remove_labels is required")
+
+    messages, missing = select_messages(params)
+    changed, history_id = mailbox.modify(messages, add_labels, remove_labels)
+
+    return {
+        "matched_count": len(messages),
+        "modified_count": len(changed),
+        "not_found": missing,
+        "history_id": history_id
+    }
 
-    email_ids = params.get("email_ids", [])
+async def history_list(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Messages added or relabelled since start_history_id, so clients can refresh
+    by delta. With `label`, relabelled messages it was taken off (and that
+    still lack it) are reported as removed, and added messages without it
+    are left out.
+    """
+
+    start_history_id = params.get("start_history_id", params.get("startHistoryId"))
+    if start_history_id is None:
+        raise ValueError("start_history_id is required")
+    label = params.get("label") or params.get("labelId")
+    max_results = params.get("max_results", HISTORY_MAX_RESULTS)
+
+    history_id = mailbox.history_id
+    added_docnos, relabelled_docnos = mailbox.history.since(int(start_history_id))
+    if len(added_docnos) + len(relabelled_docnos) > max_results:
+        return {
+            "history_id": history_id,
+            "full_sync_required": True,
+            "changed_count": len(added_docnos) + len(relabelled_docnos)
+        }
+
+    added = [mailbox.by_docno(docno) for docno in added_docnos]
+    relabelled = [mailbox.by_docno(docno) for docno in relabelled_docnos]
+    removed: List[Message] = []
+    if label:
+        added = [message for message in added if label in message.label_ids()]
+        # Only messages the label was actually taken off, not every relabelled message without it
+        taken_off = set(mailbox.history.label_removals(int(start_history_id), label))
+        removed = [message for message in relabelled
+                   if message.docno in taken_off and label not in message.label_ids()]
+        relabelled = [message for message in relabelled if label in message.label_ids()]
 
     return {
-        "marked_read": email_ids,
-        "count": len(email_ids),
-        "status": "completed"
+        "history_id": history_id,
+        "full_sync_required": False,
+        "added": [message.to_dict() for message in added],
+        "relabelled": [
+            {"id": message.id, "threadId": message.thread_id, "labels": list(message.labels), "unread": message.unread}
+            for message in relabelled
+        ],
+        "removed": [message.id for message in removed]
     }
 
 @app.get("/")
@@ -280,7 +387,9 @@ async def root():
             "draft",
             "send",
             "search",
-            "mark_read"
+            "mark_read",
+            "batch_modify",
+            "history_list"
         ]
     }
 
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Search Index - inverted index with BM25 ranking and Gmail search operators for the Gmail MCP stub
+Operators compile to posting-list intersections over the mailbox indexes; free text is ranked with BM25
+"""
+
+import re
+import math
+import heapq
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
+
+from mail_store import UNREAD, Key, Mailbox, Message, Posting, decode_cursor, encode_cursor, merge_newest_first
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Subject terms count this many times towards a message's term frequency
+SUBJECT_WEIGHT = 2
+# Relative drift of the average message length that triggers recomputing length norms
+NORM_DRIFT = 0.05
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# operator:"quoted value", "quoted text" or any other run of non-spaces, each optionally negated
+QUERY_RE = re.compile(r'-?[a-z]+:"[^"]*"|-?"[^"]*"|\S+', re.IGNORECASE)
+
+STOPWORDS = frozenset("""
+a about an and any are as at be by do email emails find for from get have i in is it its me message
+messages my of on or please show that the their this to was with you your
+""".split())
+
+# is:/in: values that name a label
+FLAG_LABELS = {
+    "unread": UNREAD,
+    "starred": "STARRED",
+    "important": "IMPORTANT",
+    "inbox": "INBOX",
+    "sent": "SENT",
+    "draft": "DRAFT",
+    "spam": "SPAM",
+    "trash": "TRASH",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens of already lowercased text"""
+    return TOKEN_RE.findall(text)
+
+
+def label_id(name: str) -> str:
+    """Label name as written in a query ("work-projects", "Inbox") -> label id ("WORK_PROJECTS", "INBOX")"""
+    return re.sub(r"[\s/-]+", "_", name.strip()).upper()
+
+
+def parse_query_date(value: str) -> int:
+    """after:/before: value (2025/01/05, 2025-01-05 or epoch seconds) -> epoch seconds"""
+    if value.isdigit() and len(value) > 8:
+        return int(value)
+    for fmt in ("%Y/%m/%d", "%Y-%m-%d"):
+        try:
+            return int(datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp())
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date in query: {value!r}")
+
+
+class TermPosting:
+    """
+    Messages containing one term: docnos (ascending, as docnos only grow)
+    with the term frequency in each, and - built on first use - the same
+    messages by descending BM25 impact, for early-terminating top-k.
+    """
+    __slots__ = ("docs", "tfs", "by_impact")
+
+    def __init__(self) -> None:
+        self.docs = array("I")
+        self.tfs = array("I")
+        # (-impact, -docno), ascending: best first, newest first among equals
+        self.by_impact: Optional[List[Tuple[float, int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def tf(self, docno: int) -> int:
+        i = bisect_left(self.docs, docno)
+        return self.tfs[i] if i < len(self.docs) and self.docs[i] == docno else 0
+
+
+@dataclass
+class Query:
+    """A compiled query: free text to rank, plus filters as posting lists"""
+    text: str
+    terms: List[str] = field(default_factory=list)
+    excluded_terms: List[str] = field(default_factory=list)
+    # Every clause must match; a clause matches when any of its postings holds the message (OR)
+    clauses: List[List[Posting]] = field(default_factory=list)
+    excluded: List[Posting] = field(default_factory=list)
+    after: Optional[int] = None
+    before: Optional[int] = None
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.clauses or self.excluded) or self.after is not None or self.before is not None
+
+    def accepts(self, docno: int, epoch: int) -> bool:
+        if self.after is not None and epoch < self.after:
+            return False
+        if self.before is not None and epoch >= self.before:
+            return False
+        for clause in self.clauses:
+            if not any(docno in posting for posting in clause):
+                return False
+        return not any(docno in posting for posting in self.excluded)
+
+
+@dataclass
+class SearchPage:
+    messages: List[Message]
+    # BM25 scores for free-text queries, None for date-ordered operator-only results
+    scores: Optional[List[float]]
+    total: int
+    # True when `total` was extrapolated instead of counted (like Gmail's resultSizeEstimate)
+    estimated: bool
+    next_page_token: Optional[str]
+
+
+class SearchIndex:
+    """
+    Inverted index over a Mailbox, updated as messages are stored.
+
+    Text terms (subject, body, sender) map to TermPostings for BM25; sender
+    tokens and addresses also map to date-ordered Postings, so `from:` is
+    intersected with the mailbox's label postings like any other operator.
+    Label changes (archiving, read state) need no work here: label operators
+    read the mailbox's own postings, which the mailbox keeps current.
+
+    Free-text queries run the threshold algorithm over impact-ordered
+    postings and stop as soon as no unseen message can enter the page, so a
+    page costs a small fraction of the matching postings.
+    """
+
+    def __init__(self, mailbox: Mailbox) -> None:
+        self.mailbox = mailbox
+        self._terms: Dict[str, TermPosting] = {}
+        self._senders: Dict[str, Posting] = {}
+        self._lengths = array("I")
+        self._total_length = 0
+        # BM25 length normalisation per docno, and the average length it was computed for
+        self._norms = array("d")
+        self._norm_average = 0.0
+        self._ranked_terms: List[TermPosting] = []
+        self.add(list(mailbox.messages()))
+        mailbox.subscribe(self.add)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, messages: List[Message]) -> None:
+        touched: Dict[int, Posting] = {}
+        for message in sorted(messages, key=lambda m: m.docno):
+            if message.docno < len(self._lengths):
+                continue
+            self._index_text(message)
+            key = message.key
+            for token in set(tokenize(message.sender_lc)) | {message.sender_lc}:
+                posting = self._senders.get(token)
+                if posting is None:
+                    posting = self._senders[token] = Posting()
+                posting.append_unsorted(key)
+                touched[id(posting)] = posting
+        for posting in touched.values():
+            posting.keys.sort()
+
+    def _index_text(self, message: Message) -> None:
+        counts: Dict[str, int] = {}
+        for token in tokenize(message.subject_lc):
+            counts[token] = counts.get(token, 0) + SUBJECT_WEIGHT
+        for token in tokenize(message.body_lc) + tokenize(message.sender_lc):
+            counts[token] = counts.get(token, 0) + 1
+
+        # Docnos are dense, so lengths and norms are indexed by docno
+        while len(self._lengths) < message.docno:
+            self._lengths.append(0)
+            self._norms.append(BM25_K1)
+        length = sum(counts.values())
+        self._lengths.append(length)
+        self._total_length += length
+        self._norms.append(self._norm(length))
+
+        for token, tf in counts.items():
+            posting = self._terms.get(token)
+            if posting is None:
+                posting = self._terms[token] = TermPosting()
+            posting.docs.append(message.docno)
+            posting.tfs.append(tf)
+            if posting.by_impact is not None:
+                insort(posting.by_impact, (-self._impact(tf, message.docno), -message.docno))
+
+    def _norm(self, length: int) -> float:
+        average = self._norm_average or 1.0
+        return BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+
+    def _impact(self, tf: int, docno: int) -> float:
+        return tf * (BM25_K1 + 1) / (tf + self._norms[docno])
+
+    def _refresh_norms(self) -> None:
+        """Recompute length norms once the average length has drifted; impact orders depend on them"""
+        average = self._total_length / max(1, len(self._lengths))
+        if self._norm_average and abs(average - self._norm_average) <= NORM_DRIFT * self._norm_average:
+            return
+        self._norm_average = average
+        self._norms = array("d", (self._norm(length) for length in self._lengths))
+        for posting in self._ranked_terms:
+            posting.by_impact = None
+        self._ranked_terms = []
+
+    def _by_impact(self, posting: TermPosting) -> List[Tuple[float, int]]:
+        if posting.by_impact is None:
+            impact = self._impact
+            posting.by_impact = sorted((-impact(tf, docno), -docno) for docno, tf in zip(posting.docs, posting.tfs))
+            self._ranked_terms.append(posting)
+        return posting.by_impact
+
+    def _sender_postings(self, value: str) -> List[Posting]:
+        value = value.lower()
+        if "@" in value and value in self._senders:
+            return [self._senders[value]]
+        empty = Posting()
+        return [self._senders.get(token, empty) for token in tokenize(value)] or [empty]
+
+    def compile(self, text: str) -> Query:
+        """
+        Parse a Gmail-style query. Supported: free text, "quoted text",
+        from:, label:, category:, in:, is:(un)read/starred/important,
+        after:/before: (YYYY/MM/DD), a leading - to negate, and OR between
+        operators.
+        """
+        query = Query(text=text)
+        join_next = False
+        for token in QUERY_RE.findall(text):
+            if token == "OR":
+                join_next = bool(query.clauses)
+                continue
+            negated = token.startswith("-") and len(token) > 1
+            if negated:
+                token = token[1:]
+
+            operator, colon, value = token.partition(":")
+            operator = operator.lower()
+            value = value.strip('"')
+            if token.startswith('"') or not colon or not value:
+                words = [word for word in tokenize(token.lower()) if word not in STOPWORDS]
+                (query.excluded_terms if negated else query.terms).extend(words)
+                join_next = False
+                continue
+
+            if operator in ("after", "newer"):
+                query.after = parse_query_date(value)
+                continue
+            if operator in ("before", "older"):
+                query.before = parse_query_date(value)
+                continue
+
+            if operator == "is" and value.lower() == "read":
+                value, negated = "unread", not negated
+            if operator == "from":
+                postings = self._sender_postings(value)
+            elif operator in ("label", "in", "is"):
+                postings = [self.mailbox.posting(FLAG_LABELS.get(value.lower(), label_id(value)))]
+            elif operator == "category":
+                postings = [self.mailbox.posting(f"CATEGORY_{label_id(value)}")]
+            else:
+                # Unknown operator: search for its words instead
+                query.terms.extend(word for word in tokenize(token.lower()) if word not in STOPWORDS)
+                continue
+
+            if negated:
+                query.excluded.extend(postings)
+            elif join_next:
+                # An OR alternative cannot be an AND of sender tokens: keep the rarest one
+                query.clauses[-1].append(min(postings, key=len))
+            else:
+                query.clauses.extend([posting] for posting in postings)
+            join_next = False
+
+        query.terms = list(dict.fromkeys(query.terms))
+        return query
+
+    def search(self, text: str, limit: int = 10, page_token: Optional[str] = None) -> SearchPage:
+        query = self.compile(text)
+        # limit 0 still reports the total, but there is no page to continue from
+        limit = max(0, limit)
+        if query.terms:
+            return self._ranked(query, limit, page_token)
+        return self._filtered(query, limit, page_token)
+
+    def select(self, text: str, within: Optional[str] = None) -> List[Message]:
+        """
+        Every message matching a query, unranked, for bulk operations. Free
+        text terms are ANDed, as in Gmail. The postings' docno sets are
+        combined with set algebra, so the cost follows the sizes of the sets
+        involved, not a walk of the mailbox. A query with nothing to match on
+        (empty, only stopwords, only negations) raises ValueError instead of
+        selecting the whole mailbox.
+        """
+        query = self.compile(text)
+        if not (query.terms or query.clauses or query.after is not None or query.before is not None):
+            raise ValueError(f"Query {text!r} has no search terms or operators to select messages by")
+        if within:
+            query.clauses.append([self.mailbox.posting(within)])
+
+        candidates: List[Collection[int]] = []
+        for term in query.terms:
+            posting = self._terms.get(term)
+            if posting is None:
+                return []
+            candidates.append(posting.docs)
+        for clause in query.clauses:
+            candidates.append(clause[0].docnos if len(clause) == 1 else set().union(*(p.docnos for p in clause)))
+        if not candidates:
+            # Only a date range: take it from the timeline
+            candidates.append(self.mailbox.timeline.docnos)
+        candidates.sort(key=len)
+        docnos = set(candidates[0])
+        for other in candidates[1:]:
+            docnos.intersection_update(other)
+        for posting in query.excluded:
+            docnos -= posting.docnos
+        for term in query.excluded_terms:
+            if term in self._terms:
+                docnos.difference_update(self._terms[term].docs)
+
+        messages = [self.mailbox.by_docno(docno) for docno in docnos]
+        if query.after is not None or query.before is not None:
+            messages = [message for message in messages if query.accepts(message.docno, message.epoch)]
+        return messages
+
+    def _ranked(self, query: Query, limit: int, page_token: Optional[str]) -> SearchPage:
+        """
+        BM25 top-k by the threshold algorithm: read the terms' impact-ordered
+        postings in lockstep, score each new message exactly (random access
+        into the other terms), and stop once the page's worst entry beats the
+        best score an unseen message could still reach. Results are ordered by
+        (score, docno) descending, which is also what the cursor encodes.
+        """
+        self._refresh_norms()
+        count = len(self._lengths)
+        terms = [(term, self._terms[term]) for term in query.terms if term in self._terms]
+        if not terms:
+            return SearchPage(messages=[], scores=[], total=0, estimated=False, next_page_token=None)
+
+        weights = [math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5)) for _, p in terms]
+        postings = [p for _, p in terms]
+        lists = [self._by_impact(p) for p in postings]
+        excluded = [self._terms[term] for term in query.excluded_terms if term in self._terms]
+        cursor = _decode_ranked_cursor(page_token) if page_token else None
+        messages = self.mailbox.by_docno
+        impact = self._impact
+
+        wanted = limit + 1
+        top: List[Tuple[float, int]] = []  # min-heap of the best (score, docno) so far
+        seen = set()
+        positions = [0] * len(lists)
+        examined = accepted = 0
+        exhausted = False
+        while not exhausted:
+            exhausted = True
+            for i, ranked in enumerate(lists):
+                if positions[i] == len(ranked):
+                    continue
+                exhausted = False
+                docno = -ranked[positions[i]][1]
+                positions[i] += 1
+                if docno in seen:
+                    continue
+                seen.add(docno)
+                examined += 1
+                if any(p.tf(docno) for p in excluded):
+                    continue
+                if query.filtered and not query.accepts(docno, messages(docno).epoch):
+                    continue
+                accepted += 1
+                score = 0.0
+                for weight, posting in zip(weights, postings):
+                    tf = posting.tf(docno)
+                    if tf:
+                        score += weight * impact(tf, docno)
+                entry = (score, docno)
+                if cursor is not None and entry >= cursor:
+                    continue
+                if len(top) < wanted:
+                    heapq.heappush(top, entry)
+                elif entry > top[0]:
+                    heapq.heapreplace(top, entry)
+
+            if len(top) == wanted and not exhausted:
+                # An unseen message scores at most the sum of the impacts at the read positions,
+                # and on a tie its docno is at most the smallest docno at those positions
+                bound = 0.0
+                bound_docno = None
+                for weight, ranked, position in zip(weights, lists, positions):
+                    if position < len(ranked):
+                        bound += weight * -ranked[position][0]
+                        docno = -ranked[position][1]
+                        bound_docno = docno if bound_docno is None else min(bound_docno, docno)
+                if bound_docno is None or top[0] > (bound, bound_docno):
+                    break
+
+        # Every match is seen only when all postings were read; otherwise extrapolate
+        largest = max(len(p) for p in postings)
+        total = accepted if exhausted else round(max(largest, len(seen)) * accepted / max(1, examined))
+        page = sorted(top, reverse=True)
+        next_page_token = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_page_token = _encode_ranked_cursor(page[-1]) if page else None
+        return SearchPage(
+            messages=[messages(docno) for _, docno in page],
+            scores=[score for score, _ in page],
+            total=total,
+            estimated=not exhausted,
+            next_page_token=next_page_token,
+        )
+
+    def _filtered(self, query: Query, limit: int, page_token: Optional[str]) -> SearchPage:
+        """
+        Operators only: walk the smallest clause newest first (merged when it
+        is an OR), probe the other postings and stop after the page, giving
+        Gmail's date-ordered results.
+        """
+        clauses = sorted(query.clauses, key=lambda clause: sum(len(p) for p in clause))
+        driver = clauses[0] if clauses else [self.mailbox.timeline]
+        rest = Query(text=query.text, clauses=clauses[1:], excluded=query.excluded)
+
+        start: Optional[Key] = (query.before, -1) if query.before is not None else None
+        if page_token:
+            cursor = decode_cursor(page_token)
+            start = cursor if start is None else min(start, cursor)
+        if len(driver) == 1:
+            keys: Iterator[Key] = driver[0].newest_first(start)
+        else:
+            keys = merge_newest_first([posting.newest_first(start) for posting in driver])
+
+        page: List[Message] = []
+        examined = accepted = 0
+        more = False
+        for key in keys:
+            if query.after is not None and key[0] < query.after:
+                break
+            examined += 1
+            if not rest.accepts(key[1], key[0]):
+                continue
+            accepted += 1
+            if len(page) == limit:
+                more = True
+                break
+            page.append(self.mailbox.by_key(key))
+
+        # A lone posting knows its size; otherwise count the first page or extrapolate from the walk
+        if len(driver) == 1 and not rest.clauses and not rest.excluded and query.after is None and query.before is None:
+            total, estimated = len(driver[0]), False
+        elif not more and not page_token:
+            total, estimated = len(page), False
+        else:
+            size = sum(len(p) for p in driver)
+            total, estimated = max(accepted, round(size * accepted / max(1, examined))), True
+        next_page_token = encode_cursor(page[-1].key) if more and page else None
+        return SearchPage(messages=page, scores=None, total=total, estimated=estimated,
+                          next_page_token=next_page_token)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"indexed": len(self._lengths), "terms": len(self._terms), "senders": len(self._senders)}
+
+
+def _encode_ranked_cursor(entry: Tuple[float, int]) -> str:
+    return f"{entry[0]!r}:{entry[1]}"
+
+
+def _decode_ranked_cursor(token: str) -> Tuple[float, int]:
+    try:
+        score, docno = token.split(":")
+        return float(score), int(docno)
+    except ValueError:
+        raise ValueError(f"Invalid page token: {token!r}") from None
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Mailbox Store tests - paging edge cases of the indexed message store
+Run with: python -m pytest stubs/gmail-mcp
+"""
+
+from mail_store import Mailbox, generate_messages
+
+
+def _mailbox(count: int = 50) -> Mailbox:
+    mailbox = Mailbox()
+    mailbox.extend(generate_messages(count, seed=7))
+    return mailbox
+
+
+def test_page_with_zero_limit_is_empty():
+    mailbox = _mailbox()
+    assert mailbox.page(limit=0) == ([], None)
+    assert mailbox.page(labels=["INBOX"], unread_only=True, limit=0) == ([], None)
+
+
+def test_pages_cover_the_mailbox_newest_first():
+    mailbox = _mailbox()
+    seen, token = [], None
+    while True:
+        page, token = mailbox.page(limit=7, page_token=token)
+        seen.extend(page)
+        if token is None:
+            break
+    assert len(seen) == 50
+    assert [m.key for m in seen] == sorted((m.key for m in seen), reverse=True)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Search Index tests - paging edge cases of the Gmail stub search
+Run with: python -m pytest stubs/gmail-mcp
+"""
+
+import pytest
+
+from mail_store import Mailbox, generate_messages
+from search import SearchIndex
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    mailbox = Mailbox()
+    index = SearchIndex(mailbox)
+    mailbox.extend(generate_messages(200, seed=7))
+    return index
+
+
+@pytest.mark.parametrize("query", ["is:unread", "label:inbox", "board"])
+def test_zero_results_page(index, query):
+    page = index.search(query, limit=0)
+    assert page.messages == []
+    assert page.next_page_token is None
+    assert page.total > 0
+